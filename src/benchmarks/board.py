@@ -0,0 +1,97 @@
+import argparse
+import random
+import time
+
+from core.board import ArrayBoard
+from core.bitboard import BitboardBoard
+from core.cache import MoveCache
+from core.coordinate import Coordinate
+from core.game import GameCore
+
+# Both backends keep the same bitboards and move generation only reads those, so the backends differ in how a
+# piece is looked up and stored by square: nested rows or a flat 64 entry list
+BACKENDS = {'ArrayBoard': ArrayBoard, 'BitboardBoard': BitboardBoard}
+SQUARES = [Coordinate.at(x, y) for y in range(8) for x in range(8)]
+
+
+def play_random_moves(game: GameCore, plies: int, seed: int) -> None:
+    rng = random.Random(seed)
+    player = game.current_player
+
+    for _ in range(plies):
+        moves = [
+            (coordinate, target, piece)
+            for coordinate, piece in list(game._board.pieces()) if piece.player == player
+            for target in game.get_possible_moves_for_piece(piece, coordinate)
+        ]
+        if not moves or not game.playable():
+            return
+
+        game.move(*rng.choice(moves))
+        player = game.current_player
+
+
+def generate_pseudo_legal(game: GameCore) -> int:
+    return sum(len(piece.get_moves(coordinate, game)) for coordinate, piece in game._board.pieces())
+
+
+def generate_legal(game: GameCore) -> int:
+    # One generation per side, the games have no move cache so every call generates the moves
+    return len(game.legal_moves(game.white)) + len(game.legal_moves(game.black))
+
+
+def look_up_squares(game: GameCore) -> int:
+    for coordinate in SQUARES:
+        game[coordinate]
+
+    return len(SQUARES)
+
+
+def make_unmake(game: GameCore) -> int:
+    moves = game.legal_moves()
+    for move in moves:
+        game.make_move(move)
+        game.unmake_move()
+
+    return len(moves)
+
+
+def measure(function, games: list[GameCore], repeat: int) -> tuple[int, float]:
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for game in games:
+            moves += function(game)
+
+    return moves, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the board backends of GameCore')
+    parser.add_argument('--positions', type=int, default=8)
+    parser.add_argument('--plies', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    # Without a cache the legal timings measure move generation instead of cache hits
+    no_cache = MoveCache(0)
+
+    for name, board_type in BACKENDS.items():
+        games = []
+        for seed in range(args.positions):
+            game = GameCore(board_type, move_cache=no_cache)
+            play_random_moves(game, args.plies, seed)
+            games.append(game)
+
+        for label, function, repeat in [
+            ('pseudo-legal', generate_pseudo_legal, args.repeat),
+            ('legal', generate_legal, args.repeat),
+            ('lookup', look_up_squares, args.repeat),
+            ('make/unmake', make_unmake, args.repeat),
+        ]:
+            count, elapsed = measure(function, games, repeat)
+            unit = 'squares' if function is look_up_squares else 'moves'
+            print(f'{name:>14} {label:>12}: {count:>8} {unit} in {elapsed:.3f}s ({count / elapsed:,.0f} {unit}/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import time
+
+from benchmarks.board import play_random_moves
+from core.game import GameCore
+from core.pieces import King
+from core.player import Player
+
+
+def scan_is_king_in_check(game: GameCore, player: Player) -> bool:
+    # The previous implementation: scan for the king, then generate every move of the opponent
+    king_coordinate = None
+    for coordinate, piece in game._board.pieces():
+        if isinstance(piece, King) and piece.player == player:
+            king_coordinate = coordinate
+
+    opposing_player = game.opponent(player)
+    for coordinate, piece in game._board.pieces():
+        if piece.player == opposing_player and king_coordinate in piece.get_moves(coordinate, game):
+            return True
+
+    return False
+
+
+def attack_map_is_king_in_check(game: GameCore, player: Player) -> bool:
+    return game.is_king_in_check(player)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare check detection against the full opponent move scan')
+    parser.add_argument('--positions', type=int, default=32)
+    parser.add_argument('--plies', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    games = []
+    for seed in range(args.positions):
+        game = GameCore()
+        play_random_moves(game, args.plies, seed)
+        games.append(game)
+
+    results = {}
+    for function in (scan_is_king_in_check, attack_map_is_king_in_check):
+        checks = []
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            checks = [function(game, player) for game in games for player in (game.white, game.black)]
+        elapsed = time.perf_counter() - start
+
+        results[function.__name__] = checks
+        calls = args.repeat * len(checks)
+        print(f'{function.__name__:>28}: {calls} calls in {elapsed:.3f}s ({elapsed / calls * 1e6:.2f} us/call)')
+
+    if len(set(map(tuple, results.values()))) != 1:
+        print('Implementations disagree!')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from benchmarks.board import play_random_moves
+from core.batch_evaluation import evaluate_batch
+from core.evaluation import evaluate
+from core.game import GameCore
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched NumPy evaluation with a per-position loop')
+    parser.add_argument('--positions', type=int, default=64, help='distinct positions, played from random games')
+    parser.add_argument('--copies', type=int, default=500, help='times every position is repeated in the batch')
+    parser.add_argument('--plies', type=int, default=20)
+    args = parser.parse_args()
+
+    positions = []
+    for seed in range(args.positions):
+        game = GameCore()
+        play_random_moves(game, args.plies, seed)
+        positions.append(game)
+    games = positions * args.copies
+
+    start = time.perf_counter()
+    scores = [evaluate(game) for game in games]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_scores = evaluate_batch(games, with_mobility=False)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluate_batch(games)
+    batch_with_mobility = time.perf_counter() - start
+
+    assert batch_scores.tolist() == scores, 'batched material and piece-square scores differ from evaluate()'
+    print(f'python loop:               {len(games) / loop:12,.0f} positions/s')
+    print(f'numpy batch:               {len(games) / batch:12,.0f} positions/s ({loop / batch:.1f}x)')
+    print(f'numpy batch with mobility: {len(games) / batch_with_mobility:12,.0f} positions/s')
+
+
+if __name__ == '__main__':
+    main()
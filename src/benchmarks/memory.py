@@ -0,0 +1,49 @@
+import argparse
+import time
+import tracemalloc
+
+from core.cache import MoveCache
+from core.game import GameCore
+from core.perft import REFERENCE_POSITIONS
+
+
+def measure_traced(function) -> tuple[object, int, int]:
+    # Memory and blocks still referenced by the result of the function, which is kept alive on purpose
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = function()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    statistics = after.compare_to(before, 'filename')
+    return result, sum(stat.size_diff for stat in statistics), sum(stat.count_diff for stat in statistics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure allocations of move generation and memory per position')
+    parser.add_argument('--copies', type=int, default=200, help='positions kept alive per reference position')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    fens = [position.fen for position in REFERENCE_POSITIONS]
+    # Without a cache every legal_moves() call generates the moves
+    no_cache = MoveCache(0)
+
+    games, size, blocks = measure_traced(lambda: [GameCore(fen=fen, move_cache=no_cache) for fen in fens * args.copies])
+    print(f'positions: {len(games)}, {size / len(games):,.0f} bytes and {blocks / len(games):,.1f} blocks per position')
+
+    moves, size, blocks = measure_traced(lambda: [game.legal_moves() for game in games[:len(fens)] * args.repeat])
+    generated = sum(map(len, moves))
+    print(f'legal moves: {generated}, {size / generated:,.1f} bytes and {blocks / generated:,.2f} blocks per move')
+
+    start = time.perf_counter()
+    for game in games[:len(fens)] * args.repeat:
+        game.legal_moves()
+    elapsed = time.perf_counter() - start
+    print(f'generation: {generated / elapsed:,.0f} moves/s')
+
+
+if __name__ == '__main__':
+    main()
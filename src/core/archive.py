@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, Type
+
+from core.board import ArrayBoard
+from core.bitboard import BitboardBoard
+from core.game import GameCore
+from core.move import Move, unpack_move
+from core.pgn import PgnError, parse_san, read_games, replay_games
+
+# An archive is two append-only files. The data file holds one record per game:
+#   ply count (16), result (8), flags (8), [FEN length (16), FEN], one packed 16-bit move per ply
+# and the index file holds the offset of every record in the data file as an unsigned 64-bit word, so game n is
+# found with one read at n * 8. All numbers are little-endian.
+MAGIC = b'CGA1'
+RECORD = struct.Struct('<HBB')
+FEN_LENGTH = struct.Struct('<H')
+OFFSET = struct.Struct('<Q')
+HAS_FEN = 1
+RESULTS = ['*', '1-0', '0-1', '1/2-1/2']
+MAX_PLIES = 0xFFFF
+
+
+@dataclass
+class ArchivedGame:
+    moves: array
+    result: str = '*'
+    # Starting position, None for the standard one
+    fen: str | None = None
+
+    def replay(self, board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard) -> Iterator[tuple[GameCore, Move]]:
+        # Plays the moves on one GameCore, which is yielded after every move
+        game = GameCore(board_type, self.fen)
+        for packed in self.moves:
+            move = unpack_move(game, packed)
+            game.make_move(move)
+            yield game, move
+
+
+class GameArchive:
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        self.index_path = self.path + '.idx'
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as file:
+                file.write(MAGIC)
+            open(self.index_path, 'wb').close()
+
+        self._data = open(self.path, 'r+b')
+        self._index = open(self.index_path, 'r+b')
+        if self._data.read(len(MAGIC)) != MAGIC:
+            self.close()
+            raise ValueError(f'{self.path} is not a game archive')
+
+    def close(self) -> None:
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> GameArchive:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return os.fstat(self._index.fileno()).st_size // OFFSET.size
+
+    def append(self, moves: list[Move] | array, result: str = '*', fen: str | None = None) -> int:
+        # Returns the number of the new game. The record is written before its index entry, so an interrupted append
+        # leaves at most some unreferenced bytes at the end of the data file.
+        if len(moves) > MAX_PLIES:
+            raise ValueError(f'Games are limited to {MAX_PLIES} plies')
+
+        packed = moves if isinstance(moves, array) else array('H', (move.pack() for move in moves))
+        if sys.byteorder != 'little':
+            packed = array('H', packed)
+            packed.byteswap()
+
+        record = RECORD.pack(len(packed), RESULTS.index(result), HAS_FEN if fen else 0)
+        if fen:
+            encoded = fen.encode()
+            record += FEN_LENGTH.pack(len(encoded)) + encoded
+
+        offset = self._data.seek(0, os.SEEK_END)
+        self._data.write(record + packed.tobytes())
+        self._data.flush()
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(OFFSET.pack(offset))
+        self._index.flush()
+        return len(self) - 1
+
+    def __getitem__(self, number: int) -> ArchivedGame:
+        if not 0 <= number < len(self):
+            raise IndexError(f'No game {number} in {self.path}')
+
+        self._index.seek(number * OFFSET.size)
+        (offset,) = OFFSET.unpack(self._index.read(OFFSET.size))
+        self._data.seek(offset)
+        return self._read_record()
+
+    def __iter__(self) -> Iterator[ArchivedGame]:
+        # Records are located through the index, an interrupted append can leave unreferenced bytes between them
+        for number in range(len(self)):
+            yield self[number]
+
+    def _read_record(self) -> ArchivedGame:
+        plies, result, flags = RECORD.unpack(self._data.read(RECORD.size))
+        fen = None
+        if flags & HAS_FEN:
+            (length,) = FEN_LENGTH.unpack(self._data.read(FEN_LENGTH.size))
+            fen = self._data.read(length).decode()
+
+        moves = array('H')
+        moves.frombytes(self._data.read(plies * 2))
+        if sys.byteorder != 'little':
+            moves.byteswap()
+        return ArchivedGame(moves, RESULTS[result], fen)
+
+
+def import_pgn(pgn_path: str | os.PathLike, archive: GameArchive) -> tuple[int, int]:
+    # Returns the number of games archived and skipped, games with a move that does not resolve are skipped
+    archived = skipped = 0
+    for pgn_game in read_games(pgn_path):
+        try:
+            game = GameCore(fen=pgn_game.tags.get('FEN'))
+            moves = array('H')
+            for san in pgn_game.moves:
+                move = parse_san(game, san)
+                moves.append(move.pack())
+                game.make_move(move)
+            archive.append(moves, pgn_game.result if pgn_game.result in RESULTS else '*', pgn_game.tags.get('FEN'))
+            archived += 1
+        except (PgnError, ValueError):
+            skipped += 1
+
+    return archived, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binary game archive with 16-bit moves')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help='append the games of a PGN file to an archive')
+    import_parser.add_argument('pgn')
+    import_parser.add_argument('archive')
+    compare_parser = subparsers.add_parser('compare', help='compare size and replay speed with the PGN file')
+    compare_parser.add_argument('pgn')
+    compare_parser.add_argument('archive')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with GameArchive(args.archive) as archive:
+            archived, skipped = import_pgn(args.pgn, archive)
+        print(f'{archived} games archived, {skipped} skipped')
+        return
+
+    start = time.perf_counter()
+    pgn_moves = sum(1 for _ in replay_games(args.pgn))
+    pgn_time = time.perf_counter() - start
+
+    with GameArchive(args.archive) as archive:
+        start = time.perf_counter()
+        archive_moves = sum(1 for game in archive for _ in game.replay())
+        archive_time = time.perf_counter() - start
+        games = len(archive)
+
+    pgn_size = os.path.getsize(args.pgn)
+    archive_size = os.path.getsize(args.archive) + os.path.getsize(args.archive + '.idx')
+    print(f'pgn:     {pgn_size:>12,} bytes, {pgn_moves:,} moves replayed in {pgn_time:.2f}s '
+          f'({pgn_moves / pgn_time:,.0f} moves/s)')
+    print(f'archive: {archive_size:>12,} bytes, {archive_moves:,} moves of {games:,} games replayed in '
+          f'{archive_time:.2f}s ({archive_moves / archive_time:,.0f} moves/s)')
+
+
+if __name__ == '__main__':
+    main()
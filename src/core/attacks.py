@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from core.coordinate import Coordinate
+
+# Precomputed attack tables shared by move generation and check detection.
+# Square n is Coordinate(n % 8, n // 8); white pawns move towards square 0.
+
+ROOK_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+KNIGHT_OFFSETS = [(1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1)]
+KING_OFFSETS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def iter_squares(bitboard: int) -> Iterator[int]:
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def to_coordinates(bitboard: int) -> list[Coordinate]:
+    return [Coordinate.from_square(square) for square in iter_squares(bitboard)]
+
+
+def _on_board(x: int, y: int) -> bool:
+    return 0 <= x <= 7 and 0 <= y <= 7
+
+
+def _step_attacks(offsets: list[tuple[int, int]]) -> list[int]:
+    table = []
+    for square in range(64):
+        x, y = square & 7, square >> 3
+        attacks = 0
+        for dx, dy in offsets:
+            if _on_board(x + dx, y + dy):
+                attacks |= 1 << ((y + dy) * 8 + x + dx)
+        table.append(attacks)
+
+    return table
+
+
+def _ray(square: int, dx: int, dy: int) -> list[int]:
+    x, y = (square & 7) + dx, (square >> 3) + dy
+    ray = []
+    while _on_board(x, y):
+        ray.append(y * 8 + x)
+        x, y = x + dx, y + dy
+
+    return ray
+
+
+def _slider_table(square: int, directions: list[tuple[int, int]]) -> tuple[int, dict[int, int]]:
+    # Attacks along a single ray only depend on the blockers of that ray, so every ray is solved on its own
+    # and the full table is the union of the per-ray answers for each subset of the relevant occupancy mask.
+    mask = 0
+    ray_tables = []
+    for dx, dy in directions:
+        ray = _ray(square, dx, dy)
+        # The last square of a ray is attacked whether or not it is occupied
+        ray_mask = sum(1 << target for target in ray[:-1])
+        mask |= ray_mask
+
+        ray_table = {}
+        subset = 0
+        while True:
+            attacks = 0
+            for target in ray:
+                attacks |= 1 << target
+                if subset >> target & 1:
+                    break
+            ray_table[subset] = attacks
+
+            subset = (subset - ray_mask) & ray_mask
+            if subset == 0:
+                break
+
+        ray_tables.append((ray_mask, ray_table))
+
+    table = {}
+    subset = 0
+    while True:
+        attacks = 0
+        for ray_mask, ray_table in ray_tables:
+            attacks |= ray_table[subset & ray_mask]
+        table[subset] = attacks
+
+        subset = (subset - mask) & mask
+        if subset == 0:
+            break
+
+    return mask, table
+
+
+def _slider_tables(directions: list[tuple[int, int]]) -> tuple[list[int], list[dict[int, int]]]:
+    masks, tables = [], []
+    for square in range(64):
+        mask, table = _slider_table(square, directions)
+        masks.append(mask)
+        tables.append(table)
+
+    return masks, tables
+
+
+KNIGHT_ATTACKS = _step_attacks(KNIGHT_OFFSETS)
+KING_ATTACKS = _step_attacks(KING_OFFSETS)
+# Indexed by PlayerType.index, white pawns capture towards the top of the board
+PAWN_ATTACKS = [_step_attacks([(-1, -1), (1, -1)]), _step_attacks([(-1, 1), (1, 1)])]
+
+# PEXT-style lookup: the occupancy restricted to the relevant mask of a square is the key of that square's table
+ROOK_MASKS, ROOK_TABLES = _slider_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_TABLES = _slider_tables(BISHOP_DIRECTIONS)
+
+
+def knight_attacks(square: int) -> int:
+    return KNIGHT_ATTACKS[square]
+
+
+def king_attacks(square: int) -> int:
+    return KING_ATTACKS[square]
+
+
+def pawn_attacks(square: int, color: int) -> int:
+    return PAWN_ATTACKS[color][square]
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def queen_attacks(square: int, occupied: int) -> int:
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]] | BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def _between(origin: int, target: int) -> int:
+    dx = (target & 7) - (origin & 7)
+    dy = (target >> 3) - (origin >> 3)
+    if origin == target or (dx and dy and abs(dx) != abs(dy)):
+        return 0
+
+    step_x, step_y = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+    between = 0
+    for square in _ray(origin, step_x, step_y):
+        if square == target:
+            return between
+        between |= 1 << square
+
+    return 0
+
+
+# Squares strictly between two squares on a shared rank, file or diagonal, used for pin rays and check evasions
+BETWEEN = [[_between(origin, target) for target in range(64)] for origin in range(64)]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from core.engine import Engine
+from core.epd import EpdStats, read_epd
+from core.game import GameCore
+from core.perft import perft
+from core.pgn import PgnGame, parse_san, read_games
+from core.transposition import TranspositionTable
+
+TASKS = ('moves', 'perft', 'search')
+
+
+@dataclass
+class BatchResult:
+    # Index of the position or game in the input stream, ply is the number of moves played in a game
+    index: int
+    ply: int
+    fen: str
+    # Legal move count, perft node count or searched nodes
+    nodes: int
+    move: str | None = None
+    score: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class BatchStats:
+    items: int = 0
+    positions: int = 0
+    nodes: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def positions_per_second(self) -> float:
+        return self.positions / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+
+# Every worker process keeps one transposition table for all of its searches instead of allocating one per position
+_table: TranspositionTable | None = None
+
+
+def analyse(game: GameCore, task: str, depth: int) -> tuple[int, str | None, int | None]:
+    global _table
+
+    if task == 'moves':
+        return len(game.legal_moves()), None, None
+    if task == 'perft':
+        return perft(game, depth), None, None
+    if task == 'search':
+        if _table is None:
+            _table = TranspositionTable()
+        # Engine.search starts a new generation, so entries of earlier positions are replaced first instead of
+        # the whole table being cleared for every position
+        result = Engine(game, _table).search(max_depth=depth)
+        return result.nodes, str(result.move) if result.move else None, result.score
+
+    raise ValueError(f'Unknown task {task!r}')
+
+
+def analyse_item(index: int, item: str | PgnGame, task: str, depth: int) -> list[BatchResult]:
+    # A FEN string is a single position, a game is analysed at its starting position and after every move
+    try:
+        if isinstance(item, str):
+            game = GameCore.from_fen(item)
+            return [BatchResult(index, 0, item, *analyse(game, task, depth))]
+
+        game = GameCore(fen=item.tags.get('FEN'))
+        results = [BatchResult(index, 0, game.to_fen(), *analyse(game, task, depth))]
+        for ply, san in enumerate(item.moves, start=1):
+            game.make_move(parse_san(game, san))
+            results.append(BatchResult(index, ply, game.to_fen(), *analyse(game, task, depth)))
+        return results
+    except ValueError as error:
+        return [BatchResult(index, 0, item if isinstance(item, str) else '', 0, error=str(error))]
+
+
+def analyse_chunk(start: int, items: list[str | PgnGame], task: str, depth: int) -> list[BatchResult]:
+    return [result for index, item in enumerate(items, start) for result in analyse_item(index, item, task, depth)]
+
+
+def run_batch(
+    items: Iterable[str | PgnGame],
+    task: str = 'moves',
+    depth: int = 1,
+    workers: int | None = None,
+    chunk_size: int = 16,
+    stats: BatchStats | None = None,
+) -> Iterator[BatchResult]:
+    # Items are sent to the workers in chunks to amortise the pickling overhead, at most two chunks per worker are
+    # in flight so that an endless input stream is consumed at the pace of the workers. Results come back in
+    # input order.
+    if task not in TASKS:
+        raise ValueError(f'Unknown task {task!r}')
+
+    workers = workers or os.cpu_count() or 1
+    stats = stats if stats is not None else BatchStats()
+    start = time.perf_counter()
+    items = iter(items)
+    pending: deque[Future[list[BatchResult]]] = deque()
+    index = 0
+
+    with ProcessPoolExecutor(workers) as executor:
+        while True:
+            while len(pending) < workers * 2 and (chunk := list(itertools.islice(items, chunk_size))):
+                pending.append(executor.submit(analyse_chunk, index, chunk, task, depth))
+                index += len(chunk)
+                stats.items += len(chunk)
+
+            if not pending:
+                break
+
+            for result in pending.popleft().result():
+                if result.error is None:
+                    stats.positions += 1
+                    stats.nodes += result.nodes
+                else:
+                    stats.errors += 1
+                stats.elapsed = time.perf_counter() - start
+                yield result
+
+    stats.elapsed = time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse positions or games on several processes')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--epd', help='EPD or FEN file, one position per line')
+    source.add_argument('--pgn', help='PGN file, every position of every game is analysed')
+    parser.add_argument('--task', choices=TASKS, default='moves')
+    parser.add_argument('--depth', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args()
+
+    epd_stats = EpdStats()
+    items = (record.fen for record in read_epd(args.epd, epd_stats)) if args.epd else read_games(args.pgn)
+    stats = BatchStats()
+    for result in run_batch(items, args.task, args.depth, args.workers, args.chunk_size, stats):
+        if args.quiet:
+            continue
+        if result.error is not None:
+            print(f'{result.index}: {result.error}')
+        else:
+            best = f' {result.move} {result.score}' if result.move else ''
+            print(f'{result.index}:{result.ply} {result.fen} {result.nodes}{best}')
+
+    print(f'{stats.items} items, {stats.positions} positions, {stats.errors} errors in {stats.elapsed:.2f}s '
+          f'with {args.workers} workers ({stats.positions_per_second:,.1f} positions/s, {stats.nps:,.0f} nodes/s)')
+    if epd_stats.skipped:
+        print(f'{epd_stats.skipped} malformed EPD lines skipped')
+
+
+if __name__ == '__main__':
+    main()
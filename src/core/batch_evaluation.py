@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from core.attacks import BISHOP_DIRECTIONS, KING_OFFSETS, KNIGHT_OFFSETS, ROOK_DIRECTIONS
+from core.evaluation import PIECE_SQUARE_TABLES, PIECE_VALUES
+from core.pieces import Bishop, Knight, Queen, Rook
+
+# Positions unpacked at a time, the planes take 768 bytes per position and their float copy four times that
+CHUNK_SIZE = 8192
+
+# Centipawns per square attacked by the pieces of a kind, indexed by Piece.kind
+MOBILITY_WEIGHTS = [0, 4, 5, 2, 1, 0]
+
+# Material plus piece-square value of a piece on a square, indexed by color * 6 + kind like the bitboards, with
+# black pieces negated so that one dot product with the planes gives the score from white's point of view
+SQUARE_VALUES = np.array(
+    [
+        [sign * (PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][square ^ flip]) for square in range(64)]
+        for sign, flip in ((1, 0), (-1, 56))
+        for kind in range(6)
+    ],
+    dtype=np.float32,
+).reshape(12 * 64)
+
+# Square 0 is a8 and square 63 is h1, so x + 1 is a left shift by one and y + 1 a left shift by eight. Squares
+# shifted across the edge of the board land on the opposite file and are masked out.
+FULL = 0xFFFF_FFFF_FFFF_FFFF
+FILE_A = sum(1 << (y * 8) for y in range(8))
+FILE_H = FILE_A << 7
+FILE_MASKS = {
+    -2: ~(FILE_H | FILE_H >> 1) & FULL,
+    -1: ~FILE_H & FULL,
+    0: FULL,
+    1: ~FILE_A & FULL,
+    2: ~(FILE_A | FILE_A << 1) & FULL,
+}
+
+_M1 = np.uint64(0x5555_5555_5555_5555)
+_M2 = np.uint64(0x3333_3333_3333_3333)
+_M4 = np.uint64(0x0F0F_0F0F_0F0F_0F0F)
+_H01 = np.uint64(0x0101_0101_0101_0101)
+
+
+def pack_bitboards(games: Sequence['GameCore'], out: np.ndarray | None = None) -> np.ndarray:
+    # (N, 12) little-endian unsigned 64-bit words, the bitboards of the games in color * 6 + kind order.
+    # Python integers cannot be viewed by NumPy, so this is the one copy, 96 bytes per position; everything
+    # downstream works on views of this array.
+    if out is None:
+        out = np.empty((len(games), 12), dtype='<u8')
+    for index, game in enumerate(games):
+        out[index] = game.bitboards
+
+    return out
+
+
+def bitboards_from_buffer(buffer) -> np.ndarray:
+    # Zero-copy (N, 12) view of any buffer of packed bitboards, such as an array('Q') or a memory-mapped file
+    return np.frombuffer(buffer, dtype='<u8').reshape(-1, 12)
+
+
+def unpack_planes(bitboards: np.ndarray) -> np.ndarray:
+    # (N, 12, 64) planes of zeros and ones, plane[n, color * 6 + kind, square]. The byte view of the words is
+    # free, only the unpacked bits are allocated.
+    count = len(bitboards)
+    bytes_view = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8).reshape(count, 12, 8)
+    return np.unpackbits(bytes_view, axis=-1, bitorder='little').reshape(count, 12, 64)
+
+
+def material_and_position(planes: np.ndarray) -> np.ndarray:
+    # Material and piece-square score from white's point of view, one matrix product for the whole batch
+    return (planes.reshape(len(planes), 12 * 64).astype(np.float32) @ SQUARE_VALUES).round().astype(np.int32)
+
+
+def mobility(bitboards: np.ndarray) -> np.ndarray:
+    # Weighted number of squares attacked by each knight, bishop, rook and queen of each side, not occupied by own
+    # pieces, from white's point of view. A square attacked by two pieces counts for both.
+    bitboards = np.ascontiguousarray(bitboards, dtype=np.uint64)
+    white = np.bitwise_or.reduce(bitboards[:, :6], axis=1)
+    black = np.bitwise_or.reduce(bitboards[:, 6:], axis=1)
+    empty = ~(white | black)
+    score = np.zeros(len(bitboards), dtype=np.int32)
+
+    for color, own, sign in ((0, white, 1), (1, black, -1)):
+        for kind, directions, sliding in (
+            (Knight.kind, KNIGHT_OFFSETS, False),
+            (Bishop.kind, BISHOP_DIRECTIONS, True),
+            (Rook.kind, ROOK_DIRECTIONS, True),
+            (Queen.kind, KING_OFFSETS, True),
+        ):
+            attacks = _attack_counts(bitboards[:, color * 6 + kind], empty, own, directions, sliding)
+            score += sign * MOBILITY_WEIGHTS[kind] * attacks
+
+    return score
+
+
+def evaluate_batch(games: Sequence['GameCore'], with_mobility: bool = True) -> np.ndarray:
+    # Scores in centipawns from the point of view of the side to move, like core.evaluation.evaluate
+    bitboards = pack_bitboards(games)
+    score = np.concatenate([
+        material_and_position(unpack_planes(bitboards[start:start + CHUNK_SIZE]))
+        for start in range(0, len(bitboards), CHUNK_SIZE)
+    ]) if len(bitboards) else np.zeros(0, dtype=np.int32)
+    if with_mobility:
+        score += mobility(bitboards)
+
+    black_to_move = np.fromiter((game.turn == game.black for game in games), dtype=bool, count=len(games))
+    return np.where(black_to_move, -score, score)
+
+
+def _shift(bitboards: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    shift = dy * 8 + dx
+    if shift > 0:
+        shifted = bitboards << np.uint64(shift)
+    else:
+        shifted = bitboards >> np.uint64(-shift)
+
+    return shifted & np.uint64(FILE_MASKS[dx])
+
+
+def _attack_counts(
+    pieces: np.ndarray,
+    empty: np.ndarray,
+    own: np.ndarray,
+    directions: list[tuple[int, int]],
+    sliding: bool,
+) -> np.ndarray:
+    # Squares attacked by all pieces in the bitboards at once, counted per piece; sliding pieces keep moving over
+    # empty squares. Rays of two pieces in the same direction never overlap, the one behind is blocked by the
+    # other, so summing the counts of every direction gives the per piece total.
+    counts = np.zeros(len(pieces), dtype=np.int32)
+    for dx, dy in directions:
+        ray = _shift(pieces, dx, dy)
+        attacks = ray
+        if sliding:
+            for _ in range(6):
+                ray = _shift(ray & empty, dx, dy)
+                attacks |= ray
+        counts += _popcount(attacks & ~own).astype(np.int32)
+
+    return counts
+
+
+def _popcount(bitboards: np.ndarray) -> np.ndarray:
+    # SWAR population count, np.bitwise_count needs NumPy 2
+    x = bitboards - ((bitboards >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
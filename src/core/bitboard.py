@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from core.attacks import iter_squares
+from core.coordinate import Coordinate
+from core.pieces import Piece
+from core.player import Player
+
+
+# One 64-bit integer per piece kind and color plus occupancy masks.
+# Bit n is Coordinate(n % 8, n // 8), so bit 0 is the top left corner of the board.
+# A flat mailbox is kept next to the bitboards so that __getitem__ stays a single lookup.
+class BitboardBoard:
+    _bitboards: list[int]
+    _occupancy: list[int]
+    _squares: list[Piece | None]
+
+    def __init__(self, rows: list[list[Piece | None]] | None = None):
+        self._bitboards = [0] * 12
+        self._occupancy = [0, 0]
+        self._squares = [None] * 64
+
+        for y, row in enumerate(rows or []):
+            for x, piece in enumerate(row):
+                if piece is not None:
+                    self._put(y * 8 + x, piece)
+
+    @property
+    def occupied(self) -> int:
+        return self._occupancy[0] | self._occupancy[1]
+
+    def occupancy(self, player: Player) -> int:
+        return self._occupancy[player.type.index]
+
+    @property
+    def bitboards(self) -> list[int]:
+        return self._bitboards
+
+    def bitboard(self, kind: int, player: Player) -> int:
+        return self._bitboards[player.type.index * 6 + kind]
+
+    def __getitem__(self, item: Coordinate) -> Piece | None:
+        return self._squares[item.y * 8 + item.x]
+
+    def __setitem__(self, key: Coordinate, value: Piece | None) -> None:
+        square = key.y * 8 + key.x
+        self._remove(square)
+        if value is not None:
+            self._put(square, value)
+
+    def pieces(self) -> Iterator[tuple[Coordinate, Piece]]:
+        for square in iter_squares(self.occupied):
+            yield Coordinate.from_square(square), self._squares[square]
+
+    def _put(self, square: int, piece: Piece) -> None:
+        bit = 1 << square
+        color = piece.player.type.index
+        self._bitboards[color * 6 + piece.kind] |= bit
+        self._occupancy[color] |= bit
+        self._squares[square] = piece
+
+    def _remove(self, square: int) -> None:
+        piece = self._squares[square]
+        if piece is None:
+            return
+
+        mask = ~(1 << square)
+        color = piece.player.type.index
+        self._bitboards[color * 6 + piece.kind] &= mask
+        self._occupancy[color] &= mask
+        self._squares[square] = None
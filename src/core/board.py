@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from core.coordinate import Coordinate
+from core.pieces import Piece
+from core.player import Player
+
+
+class ArrayBoard:
+    _rows: list[list[Piece | None]]
+    _bitboards: list[int]
+    _occupancy: list[int]
+
+    def __init__(self, rows: list[list[Piece | None]]):
+        self._rows = rows
+        self._bitboards = [0] * 12
+        self._occupancy = [0, 0]
+
+        for coordinate, piece in self.pieces():
+            self._occupancy[piece.player.type.index] |= 1 << coordinate.square
+            self._bitboards[piece.player.type.index * 6 + piece.kind] |= 1 << coordinate.square
+
+    @property
+    def occupied(self) -> int:
+        return self._occupancy[0] | self._occupancy[1]
+
+    def occupancy(self, player: Player) -> int:
+        return self._occupancy[player.type.index]
+
+    @property
+    def bitboards(self) -> list[int]:
+        return self._bitboards
+
+    def bitboard(self, kind: int, player: Player) -> int:
+        return self._bitboards[player.type.index * 6 + kind]
+
+    def __getitem__(self, item: Coordinate) -> Piece | None:
+        return self._rows[item.y][item.x]
+
+    def __setitem__(self, key: Coordinate, value: Piece | None) -> None:
+        bit = 1 << (key.y * 8 + key.x)
+        if (piece := self._rows[key.y][key.x]) is not None:
+            self._occupancy[piece.player.type.index] &= ~bit
+            self._bitboards[piece.player.type.index * 6 + piece.kind] &= ~bit
+        if value is not None:
+            self._occupancy[value.player.type.index] |= bit
+            self._bitboards[value.player.type.index * 6 + value.kind] |= bit
+
+        self._rows[key.y][key.x] = value
+
+    def pieces(self) -> Iterator[tuple[Coordinate, Piece]]:
+        for y, row in enumerate(self._rows):
+            for x, piece in enumerate(row):
+                if piece is not None:
+                    yield Coordinate.at(x, y), piece
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+from core.fen import STARTING_FEN
+from core.game import GameCore
+from core.move import Move
+from core.pgn import PgnError, parse_san, read_games
+
+# Entries follow the Polyglot layout: 16 bytes, big-endian, sorted by key
+#   key (64): position key, move (16), weight (16), learn (32)
+# The key is GameCore.hash_key, not the Polyglot key, so books are only readable by this project.
+ENTRY = struct.Struct('>QHHI')
+KEY = struct.Struct('>Q')
+MAX_WEIGHT = 0xFFFF
+
+# Weight of a move by the result of the game for the side that played it, as Polyglot books count them
+RESULT_WEIGHTS = {'1-0': (2, 0), '0-1': (0, 2), '1/2-1/2': (1, 1), '*': (1, 1)}
+
+
+class BookEntry(NamedTuple):
+    key: int
+    move: int
+    weight: int
+    learn: int
+
+
+def encode_book_move(move: Move) -> int:
+    # Polyglot move bits: to file (3), to rank (3), from file (3), from rank (3), promotion (3), ranks start at 1.
+    # The Polyglot promotion codes, knight 1 to queen 4, are the same as Piece.kind
+    old_square, new_square = move.old_square, move.new_square
+    promotion = move.promotion.kind if move.promotion else 0
+    return new_square.x | (7 - new_square.y) << 3 | old_square.x << 6 | (7 - old_square.y) << 9 | promotion << 12
+
+
+class OpeningBook:
+    # The book file is memory-mapped and searched in place, only the pages touched by the binary search are read
+    def __init__(self, path: str | os.PathLike):
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size % ENTRY.size:
+            self._file.close()
+            raise ValueError(f'{path} is not a book file, its size is not a multiple of {ENTRY.size} bytes')
+
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.size = size // ENTRY.size
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> OpeningBook:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def entries(self, key: int) -> list[BookEntry]:
+        # Binary search for the first entry with the key, the entries of one position are next to each other
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self._data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        for index in range(low, self.size):
+            entry = BookEntry(*ENTRY.unpack_from(self._data, index * ENTRY.size))
+            if entry.key != key:
+                break
+            entries.append(entry)
+
+        return entries
+
+    def moves(self, game: GameCore) -> list[tuple[Move, int]]:
+        # Book moves of the position with their weights, moves that are not legal in the position are left out
+        weights = {entry.move: entry.weight for entry in self.entries(game.hash_key)}
+        if not weights:
+            return []
+
+        return [(move, weights[code]) for move in game.legal_moves() if (code := encode_book_move(move)) in weights]
+
+    def choose(self, game: GameCore, rng: random.Random | None = None) -> Move | None:
+        # A random book move, more likely the higher its weight
+        moves = [(move, weight) for move, weight in self.moves(game) if weight]
+        if not moves:
+            return None
+
+        return (rng or random).choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+
+
+def build_book(pgn_paths: Iterable[str | os.PathLike], output: str | os.PathLike, max_ply: int = 20) -> int:
+    # Counts the moves of the first max_ply plies of every game by position, weighted by the game result, and
+    # writes them sorted by key. Games that do not replay are skipped from the first illegal move on.
+    weights: Counter[tuple[int, int]] = Counter()
+    for path in pgn_paths:
+        for pgn_game in read_games(path):
+            result_weights = RESULT_WEIGHTS.get(pgn_game.result, (1, 1))
+            try:
+                game = GameCore(fen=pgn_game.tags.get('FEN'))
+                for san in pgn_game.moves[:max_ply]:
+                    move = parse_san(game, san)
+                    if weight := result_weights[game.turn.type.index]:
+                        weights[game.hash_key, encode_book_move(move)] += weight
+                    game.make_move(move)
+            except (PgnError, ValueError):
+                continue
+
+    # Weights are scaled down to fit 16 bits, keeping every move that was played at least once
+    scale = max(1, -(-max(weights.values(), default=0) // MAX_WEIGHT))
+    with open(output, 'wb') as file:
+        for (key, move), weight in sorted(weights.items()):
+            file.write(ENTRY.pack(key, move, max(1, weight // scale), 0))
+
+    return len(weights)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or probe an opening book')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='build a book from PGN files')
+    build_parser.add_argument('output')
+    build_parser.add_argument('pgn', nargs='+')
+    build_parser.add_argument('--max-ply', type=int, default=20)
+    probe_parser = subparsers.add_parser('probe', help='list the book moves of a position')
+    probe_parser.add_argument('book')
+    probe_parser.add_argument('--fen', default=STARTING_FEN)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f'{build_book(args.pgn, args.output, args.max_ply)} entries written to {args.output}')
+        return
+
+    with OpeningBook(args.book) as book:
+        game = GameCore.from_fen(args.fen)
+        moves = sorted(book.moves(game), key=lambda item: item[1], reverse=True)
+        total = sum(weight for _, weight in moves)
+        for move, weight in moves:
+            print(f'{move} {weight} {weight / total:.1%}')
+
+
+if __name__ == '__main__':
+    main()
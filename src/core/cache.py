@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from core.move import Move
+
+DEFAULT_SIZE = 4096
+
+
+class MoveCache:
+    # Legal move lists keyed by the Zobrist key of the position, least recently used first. The key changes with
+    # every move, so an entry never goes stale, and one cache can be shared by any number of games.
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.size = size
+        self._entries: OrderedDict[int, list[Move]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int) -> list[Move] | None:
+        if (moves := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return moves
+
+    def put(self, key: int, moves: list[Move]) -> None:
+        if self.size <= 0:
+            return
+
+        self._entries[key] = moves
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+        }
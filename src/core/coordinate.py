@@ -4,8 +4,12 @@ from dataclasses import dataclass
 
 from core.player import PlayerType, Player
 
+FILES = 'abcdefgh'
 
-@dataclass
+
+# Coordinates are immutable, and the 64 on-board ones are interned: at(), from_square(), shift() and __add__ hand
+# out the shared instances instead of allocating
+@dataclass(frozen=True, slots=True)
 class Coordinate:
     x: int
     y: int
@@ -21,9 +25,37 @@ class Coordinate:
             x *= -1
             y *= -1
 
-        coordinate = Coordinate(initial_coordinate.x + x, initial_coordinate.y + y)
-        if 0 <= coordinate.y <= 7 and 0 <= coordinate.x <= 7:
-            return coordinate
+        x, y = initial_coordinate.x + x, initial_coordinate.y + y
+        if 0 <= y <= 7 and 0 <= x <= 7:
+            return SQUARES[y * 8 + x]
+
+    @classmethod
+    def from_algebraic(cls, notation: str) -> Coordinate:
+        if len(notation) != 2 or notation[0] not in FILES or notation[1] not in '12345678':
+            raise ValueError(f'Invalid square: {notation!r}')
+        return SQUARES[(8 - int(notation[1])) * 8 + FILES.index(notation[0])]
+
+    @classmethod
+    def at(cls, x: int, y: int) -> Coordinate:
+        return SQUARES[y * 8 + x]
+
+    @classmethod
+    def from_square(cls, square: int) -> Coordinate:
+        return SQUARES[square]
+
+    @property
+    def square(self) -> int:
+        return self.y * 8 + self.x
+
+    @property
+    def algebraic(self) -> str:
+        return f'{FILES[self.x]}{8 - self.y}'
 
     def __add__(self, other: Coordinate) -> Coordinate:
-        return Coordinate(self.x + other.x, self.y + other.y)
+        x, y = self.x + other.x, self.y + other.y
+        if 0 <= y <= 7 and 0 <= x <= 7:
+            return SQUARES[y * 8 + x]
+        return Coordinate(x, y)
+
+
+SQUARES = [Coordinate(square & 7, square >> 3) for square in range(64)]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from core.evaluation import evaluate
+from core.tablebase import Tablebase
+from core.game import GameCore
+from core.move import Move
+from core.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+INFINITY = 10_000_000
+MATE_SCORE = 1_000_000
+# Scores beyond this are mates, the distance to mate is MATE_SCORE minus the score
+MATE_THRESHOLD = MATE_SCORE - 1000
+
+
+@dataclass
+class SearchResult:
+    move: Move | None
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+
+class Engine:
+    # Limits are checked every this many nodes, reading the clock on every node would dominate the search
+    CHECK_INTERVAL = 1024
+
+    def __init__(
+        self,
+        game: GameCore,
+        table: TranspositionTable | None = None,
+        stop_event=None,
+        on_iteration: Callable[[SearchResult], None] | None = None,
+        tablebase: Tablebase | None = None,
+    ):
+        self.game = game
+        self.table = table if table is not None else TranspositionTable()
+        # Any object with an is_set() method, such as a threading or multiprocessing Event, can stop the search
+        self.stop_event = stop_event
+        # Called with the result of every completed iteration
+        self.on_iteration = on_iteration
+        self.tablebase = tablebase
+        self.nodes = 0
+        self._stopped = False
+        self._max_nodes: int | None = None
+        self._deadline: float | None = None
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def search(
+        self,
+        max_depth: int = 64,
+        max_nodes: int | None = None,
+        time_limit: float | None = None,
+        start_depth: int = 1,
+    ) -> SearchResult:
+        # Iterative deepening, every iteration starts with the best move of the previous one
+        start = time.perf_counter()
+        self.nodes = 0
+        self._stopped = False
+        self._max_nodes = max_nodes
+        self._deadline = start + time_limit if time_limit is not None else None
+        self.table.new_search()
+
+        moves = self._order(self.game.legal_moves())
+        result = SearchResult(moves[0] if moves else None, 0, 0, 0, 0.0)
+        if not moves:
+            return result
+
+        for depth in range(min(start_depth, max_depth), max_depth + 1):
+            score, move = self._search_root(moves, depth)
+            # An unfinished iteration is only trusted if it already improved on the previous best move
+            if self._stopped and (move is None or move is result.move):
+                break
+
+            result = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            if self.on_iteration is not None:
+                self.on_iteration(result)
+            if self._stopped or abs(score) >= MATE_THRESHOLD:
+                break
+
+            # Another iteration takes several times longer than this one, so do not start what cannot finish
+            if self._deadline is not None and time.perf_counter() - start > (self._deadline - start) / 2:
+                break
+
+            moves.remove(move)
+            moves.insert(0, move)
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _search_root(self, moves: list[Move], depth: int) -> tuple[int, Move | None]:
+        game = self.game
+        alpha, best_move = -INFINITY, None
+
+        for move in moves:
+            game.make_move(move)
+            score = -self._negamax(depth - 1, 1, -INFINITY, -alpha)
+            game.unmake_move()
+
+            if self._stopped:
+                break
+            if score > alpha:
+                alpha, best_move = score, move
+
+        return alpha, best_move
+
+    def _negamax(self, depth: int, ply: int, alpha: int, beta: int) -> int:
+        game = self.game
+        if self._count_node():
+            return 0
+
+        if game.halfmove_clock >= 100 or game.is_repetition():
+            return 0
+        if self.tablebase is not None and (result := self.tablebase.probe(game)) is not None:
+            # Exact values, the distance to mate is counted from the root like the mate scores of the search
+            return result.wdl * (MATE_SCORE - ply - result.dtm)
+        if depth <= 0:
+            return self._quiescence(ply, alpha, beta)
+
+        original_alpha = alpha
+        hash_move = 0
+        if (entry := self.table.probe(game.hash_key)) is not None:
+            hash_move = entry.move
+            if entry.depth >= depth:
+                score = self._score_from_table(entry.score, ply)
+                if (
+                    entry.bound == EXACT
+                    or entry.bound == LOWER_BOUND and score >= beta
+                    or entry.bound == UPPER_BOUND and score <= alpha
+                ):
+                    return score
+
+        moves = game.legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if game.is_king_in_check(game.turn) else 0
+
+        best_score, best_move = -INFINITY, None
+        for move in self._order(moves, hash_move):
+            game.make_move(move)
+            score = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            game.unmake_move()
+
+            if self._stopped:
+                return 0
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.store(game.hash_key, depth, self._score_to_table(best_score, ply), bound, best_move.pack())
+
+        return best_score
+
+    def _quiescence(self, ply: int, alpha: int, beta: int) -> int:
+        # Only captures and promotions are searched, so the static evaluation is never taken in the middle of a trade
+        game = self.game
+        if self._count_node():
+            return 0
+
+        stand_pat = evaluate(game)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        for move in self._order([move for move in game.legal_moves() if move.captured_piece or move.promotion]):
+            game.make_move(move)
+            score = -self._quiescence(ply + 1, -beta, -alpha)
+            game.unmake_move()
+
+            if self._stopped:
+                return 0
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+
+        return alpha
+
+    def _count_node(self) -> bool:
+        self.nodes += 1
+        if self.nodes % self.CHECK_INTERVAL == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                self._stopped = True
+            if self.stop_event is not None and self.stop_event.is_set():
+                self._stopped = True
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            self._stopped = True
+
+        return self._stopped
+
+    @staticmethod
+    def _score_to_table(score: int, ply: int) -> int:
+        # Mate scores are stored relative to the position instead of the root, so they stay valid at any ply
+        if score >= MATE_THRESHOLD:
+            return score + ply
+        if score <= -MATE_THRESHOLD:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _score_from_table(score: int, ply: int) -> int:
+        if score >= MATE_THRESHOLD:
+            return score - ply
+        if score <= -MATE_THRESHOLD:
+            return score + ply
+        return score
+
+    @staticmethod
+    def _order(moves: list[Move], hash_move: int = 0) -> list[Move]:
+        moves = sorted(moves, key=Engine._move_priority, reverse=True)
+
+        # The best move found the last time this position was searched goes first
+        if hash_move:
+            for index, move in enumerate(moves):
+                if move.pack() == hash_move:
+                    moves.insert(0, moves.pop(index))
+                    break
+
+        return moves
+
+    @staticmethod
+    def _move_priority(move: Move) -> int:
+        # MVV-LVA: the most valuable victim first, and for the same victim the least valuable attacker first
+        priority = 0
+        if move.captured_piece:
+            priority += move.captured_piece.value * 1000 - move.moving_piece.value
+        if move.promotion:
+            priority += move.promotion.value * 1000
+
+        return priority
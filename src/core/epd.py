@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import mmap
+import os
+from dataclasses import dataclass, field
+from typing import Iterator, Type
+
+from core.board import ArrayBoard
+from core.bitboard import BitboardBoard
+from core.fen import FenPosition, parse_fen
+from core.game import GameCore
+
+
+@dataclass
+class EpdRecord:
+    fen: str
+    # EPD operations such as bm, id or the D1..Dn perft counts, keyed by opcode
+    operations: dict[str, str] = field(default_factory=dict)
+    line_number: int = 0
+    # Set by read_epd, which parses every FEN once so that games can be built without parsing it again
+    position: FenPosition | None = None
+
+
+@dataclass
+class EpdStats:
+    records: int = 0
+    skipped: int = 0
+
+
+def parse_epd(line: str, line_number: int = 0) -> EpdRecord:
+    # Accepts EPD lines (four FEN fields followed by operations) as well as plain six field FEN lines
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise ValueError(f'Invalid EPD on line {line_number}: {line!r}')
+
+    rest = fields[4] if len(fields) > 4 else ''
+    clocks = rest.split(None, 2)
+    if len(clocks) >= 2 and clocks[0].isdigit() and clocks[1].isdigit():
+        fen = ' '.join(fields[:4] + clocks[:2])
+        rest = clocks[2] if len(clocks) > 2 else ''
+    else:
+        fen = ' '.join(fields[:4])
+
+    operations = {}
+    for operation in rest.split(';'):
+        if operation := operation.strip():
+            opcode, _, operand = operation.partition(' ')
+            operations[opcode] = operand.strip().strip('"')
+
+    return EpdRecord(fen, operations, line_number)
+
+
+def read_epd(path: str | os.PathLike, stats: EpdStats | None = None) -> Iterator[EpdRecord]:
+    # The file is memory-mapped and read one line at a time, so memory use does not depend on the file size.
+    # Malformed lines and invalid positions are counted in stats and skipped instead of ending the stream.
+    stats = stats if stats is not None else EpdStats()
+
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line_number, line in enumerate(iter(mapped.readline, b''), start=1):
+                line = line.decode('utf-8', errors='replace').strip()
+                if not line or line.startswith('#'):
+                    continue
+
+                try:
+                    record = parse_epd(line, line_number)
+                    record.position = parse_fen(record.fen, GameCore.white, GameCore.black)
+                except ValueError:
+                    stats.skipped += 1
+                    continue
+
+                stats.records += 1
+                yield record
+
+
+def read_positions(
+    path: str | os.PathLike,
+    board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard,
+    reuse: bool = False,
+    stats: EpdStats | None = None,
+) -> Iterator[GameCore]:
+    # With reuse every position is loaded into the same GameCore, which is only valid until the next one is read
+    game = GameCore(board_type) if reuse else None
+    for record in read_epd(path, stats):
+        if game is not None:
+            game.load_position(record.position)
+            yield game
+        else:
+            yield GameCore(board_type, position=record.position)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from core.coordinate import Coordinate
+from core.move import BLACK_KINGSIDE, BLACK_QUEENSIDE, WHITE_KINGSIDE, WHITE_QUEENSIDE
+from core.movegen import attackers
+from core.pieces import Bishop, King, Knight, Piece, Queen, Rook
+from core.pieces.pawn import Pawn
+from core.player import Player
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+PIECES = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+CASTLING_RIGHTS = {'K': WHITE_KINGSIDE, 'Q': WHITE_QUEENSIDE, 'k': BLACK_KINGSIDE, 'q': BLACK_QUEENSIDE}
+
+
+@dataclass
+class FenPosition:
+    rows: list[list[Piece | None]]
+    white_to_move: bool
+    castling_rights: int
+    en_passant: Coordinate | None
+    halfmove_clock: int
+    fullmove_number: int
+
+
+def parse_fen(fen: str, white: Player, black: Player) -> FenPosition:
+    fields = fen.split()
+    if len(fields) < 4:
+        raise ValueError(f'Invalid FEN, expected at least 4 fields: {fen!r}')
+
+    placement, side, castling, en_passant = fields[:4]
+    halfmove_clock = fields[4] if len(fields) > 4 else '0'
+    fullmove_number = fields[5] if len(fields) > 5 else '1'
+
+    rows = []
+    for row_notation in placement.split('/'):
+        row = []
+        for char in row_notation:
+            if char.isdigit():
+                row.extend([None] * int(char))
+            elif char.lower() in PIECES:
+                row.append(PIECES[char.lower()](white if char.isupper() else black))
+            else:
+                raise ValueError(f'Invalid FEN piece {char!r}: {fen!r}')
+
+        if len(row) != 8:
+            raise ValueError(f'Invalid FEN row {row_notation!r}: {fen!r}')
+        rows.append(row)
+
+    if len(rows) != 8:
+        raise ValueError(f'Invalid FEN, expected 8 rows: {fen!r}')
+    for player in (white, black):
+        if sum(isinstance(piece, King) and piece.player == player for row in rows for piece in row) != 1:
+            raise ValueError(f'Invalid FEN, expected one {player.type.value} king: {fen!r}')
+    if any(isinstance(piece, Pawn) for piece in rows[0] + rows[7]):
+        raise ValueError(f'Invalid FEN, pawn on the first or last rank: {fen!r}')
+    if side not in ('w', 'b'):
+        raise ValueError(f'Invalid FEN side to move {side!r}: {fen!r}')
+    # Move generation assumes the king of the side that just moved is safe, otherwise it could be captured
+    if _in_check(rows, black if side == 'w' else white):
+        raise ValueError(f'Invalid FEN, the side not to move is in check: {fen!r}')
+    if castling != '-' and any(char not in CASTLING_RIGHTS for char in castling):
+        raise ValueError(f'Invalid FEN castling rights {castling!r}: {fen!r}')
+
+    # Rights without the king and rook on their initial squares are dropped instead of producing broken castling
+    castling_rights = 0
+    for char in set(castling) - {'-'}:
+        y, rook_x = (7 if char.isupper() else 0), (7 if char.lower() == 'k' else 0)
+        king, rook = rows[y][4], rows[y][rook_x]
+        if isinstance(king, King) and isinstance(rook, Rook) and king.player == rook.player == (
+            white if char.isupper() else black
+        ):
+            castling_rights |= CASTLING_RIGHTS[char]
+
+    # Likewise an en passant square is only kept when a pawn of the side not to move can just have passed it
+    en_passant_square = None if en_passant == '-' else Coordinate.from_algebraic(en_passant)
+    if en_passant_square is not None:
+        y, direction, opponent = (2, 1, black) if side == 'w' else (5, -1, white)
+        x = en_passant_square.x
+        pawn = rows[y + direction][x]
+        if not (
+            en_passant_square.y == y
+            and rows[y][x] is None
+            and rows[y - direction][x] is None
+            and isinstance(pawn, Pawn)
+            and pawn.player == opponent
+        ):
+            en_passant_square = None
+
+    return FenPosition(
+        rows=rows,
+        white_to_move=side == 'w',
+        castling_rights=castling_rights,
+        en_passant=en_passant_square,
+        halfmove_clock=int(halfmove_clock),
+        fullmove_number=int(fullmove_number),
+    )
+
+
+def _in_check(rows: list[list[Piece | None]], player: Player) -> bool:
+    bitboards, occupied, king_square = [0] * 12, 0, 0
+    for y, row in enumerate(rows):
+        for x, piece in enumerate(row):
+            if piece is None:
+                continue
+
+            square = y * 8 + x
+            bitboards[piece.player.type.index * 6 + piece.kind] |= 1 << square
+            occupied |= 1 << square
+            if isinstance(piece, King) and piece.player == player:
+                king_square = square
+
+    return attackers(bitboards, king_square, 1 - player.type.index, occupied) != 0
+
+
+def format_fen(game: 'GameCore') -> str:
+    rows = []
+    for y in range(8):
+        row, empty = '', 0
+        for x in range(8):
+            piece = game[Coordinate.at(x, y)]
+            if piece is None:
+                empty += 1
+                continue
+
+            if empty:
+                row += str(empty)
+                empty = 0
+            row += piece.code[1].upper() if piece.player == game.white else piece.code[1].lower()
+
+        rows.append(row + (str(empty) if empty else ''))
+
+    castling = ''.join(char for char, right in CASTLING_RIGHTS.items() if game.castling_rights & right) or '-'
+    en_passant = game.en_passant.algebraic if game.en_passant is not None else '-'
+    side = 'w' if game.turn == game.white else 'b'
+
+    return f'{"/".join(rows)} {side} {castling} {en_passant} {game.halfmove_clock} {game.fullmove_number}'
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from typing import Iterator
+from typing import Iterator, Type
 
+from core.board import ArrayBoard
+from core.bitboard import BitboardBoard
+from core.fen import FenPosition, format_fen, parse_fen
+from core.movegen import attackers, generate_legal_moves, pin_rays
 from core.pieces import Piece
 from core.pieces.bishop import Bishop
 from core.pieces.king import King
@@ -9,43 +13,120 @@ from core.pieces.knight import Knight
 from core.pieces.pawn import Pawn
 from core.pieces.queen import Queen
 from core.pieces.rook import Rook
+from core.zobrist import BLACK_TO_MOVE_KEY, CASTLING_KEYS, compute_hash, en_passant_key, piece_key
+from core.move import ALL_CASTLING_RIGHTS, CASTLING_RIGHTS_MASK
 from core.player import Player, PlayerType
+from core.position import Position
 
 
 class GameCore:
     white: Player = Player(type=PlayerType.white)
     black: Player = Player(type=PlayerType.black)
-    _board: list[list[Piece | None]]
+    _board: ArrayBoard | BitboardBoard
+
+    def __init__(
+        self,
+        board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard,
+        fen: str | None = None,
+        move_cache: MoveCache | None = None,
+        position: FenPosition | None = None,
+    ):
+        self._board_type = board_type
+        # Games can share one cache, positions reached in several games then only generate their moves once
+        self.move_cache = move_cache if move_cache is not None else MoveCache()
+        if fen is not None:
+            self.load_fen(fen)
+        elif position is not None:
+            self.load_position(position)
+        else:
+            self._set_position(self.__initialize_board(), self.white, ALL_CASTLING_RIGHTS, None, 0, 1)
+
+    @classmethod
+    def from_fen(cls, fen: str, board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard) -> GameCore:
+        return cls(board_type, fen)
+
+    def load_fen(self, fen: str) -> None:
+        self.load_position(parse_fen(fen, self.white, self.black))
+
+    def load_position(self, position: FenPosition) -> None:
+        # The position must have been parsed with the shared GameCore.white and GameCore.black players
+        self._set_position(
+            position.rows,
+            self.white if position.white_to_move else self.black,
+            position.castling_rights,
+            position.en_passant,
+            position.halfmove_clock,
+            position.fullmove_number,
+        )
+
+    def to_fen(self) -> str:
+        return format_fen(self)
+
+    def _set_position(
+        self,
+        rows: list[list[Piece | None]],
+        turn: Player,
+        castling_rights: int,
+        en_passant: Coordinate | None,
+        halfmove_clock: int,
+        fullmove_number: int,
+    ) -> None:
+        self._board = self._board_type(rows)
+        self.turn = turn
+        self.castling_rights = castling_rights
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+        # Every entry is the move with the state it cannot be derived from: castling rights, en passant square,
+        # halfmove clock and hash key before the move
+        self._history: list[tuple[Move, int, Coordinate | None, int, int]] = []
+        self._kings = [
+            self._find_king(self.white),
+            self._find_king(self.black),
+        ]
 
-    def __init__(self):
-        self._board = self.__initialize_board()
-
-        def __get_current_player() -> Iterator[Player]:
-            while True:
-                yield self.white
-                yield self.black
-
-        self.__get_current_player = __get_current_player()
         self._playable = True
         self.white_won = False
         self.black_won = False
+        self.hash_key = compute_hash(self)
 
     def playable(self) -> bool:
         return self._playable
 
     @property
     def current_player(self) -> Player:
-        return self.__get_current_player.__next__()
-
-    def get_possible_moves_for_piece(self, piece: Piece, initial_coordinate: Coordinate) -> list[Coordinate]:
-        all_possible_moves = piece.get_moves(initial_coordinate, self)
-        legal_moves = []
+        return self.turn
 
-        for move in all_possible_moves:
-            if self.is_move_legal(initial_coordinate, move, piece.player):
-                legal_moves.append(move)
+    def opponent(self, player: Player) -> Player:
+        return self.black if player.type == PlayerType.white else self.white
 
-        return legal_moves
+    def get_possible_moves_for_piece(self, piece: Piece, initial_coordinate: Coordinate) -> list[Coordinate]:
+        # Promotions produce one move per piece kind for the same square
+        return [
+            move.new_square for move in self.legal_moves(piece.player)
+            if move.old_square == initial_coordinate and (not move.promotion or isinstance(move.promotion, Queen))
+        ]
+
+    def legal_moves(self, player: Player | None = None) -> list[Move]:
+        # The returned list is shared with the move cache and must not be modified
+        if player is not None and player != self.turn:
+            return generate_legal_moves(self.position(), player.type.index)
+
+        if (moves := self.move_cache.get(self.hash_key)) is None:
+            moves = generate_legal_moves(self.position(), self.turn.type.index)
+            self.move_cache.put(self.hash_key, moves)
+        return moves
+
+    def position(self) -> Position:
+        board = self._board
+        return Position(
+            bitboards=tuple(board.bitboards),
+            occupancy=(board.occupancy(self.white), board.occupancy(self.black)),
+            color=self.turn.type.index,
+            castling_rights=self.castling_rights,
+            en_passant=self.en_passant.square if self.en_passant is not None else None,
+            hash_key=self.hash_key,
+        )
 
     def __initialize_board(self) -> list[list[Piece | None]]:
         order_of_pieces = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
@@ -63,103 +144,195 @@ class GameCore:
         return board
 
     def __getitem__(self, item: 'Coordinate') -> Piece | None:
-        return self._board[item.y][item.x]
+        return self._board[item]
 
     def __setitem__(self, key: 'Coordinate', value) -> None:
-        self._board[key.y][key.x] = value
+        self._board[key] = value
 
-    def move(self, coordinate: Coordinate, user_selected_coordinate: Coordinate, user_selected_piece: Piece):
-        if piece_to_be_captured := self[user_selected_coordinate]:
-            if piece_to_be_captured.code[1] == 'K':
-                self._playable = False
+    @property
+    def occupied(self) -> int:
+        return self._board.occupied
 
-                self.white_won = user_selected_piece.player.type == PlayerType.white
-                self.black_won = user_selected_piece.player.type == PlayerType.black
+    def pieces(self) -> Iterator[tuple[Coordinate, Piece]]:
+        return self._board.pieces()
 
-        self[coordinate] = None
-        self[user_selected_coordinate] = user_selected_piece
-        user_selected_piece.moved = True
+    def occupancy(self, player: Player) -> int:
+        return self._board.occupancy(player)
 
-    def is_move_legal(self, start_coordinate, end_coordinate, current_player):
-        # Copy the current board to simulate the move
-        simulated_board = [row[:] for row in self._board]
-        piece_to_move = simulated_board[start_coordinate.y][start_coordinate.x]
-        simulated_board[start_coordinate.y][start_coordinate.x] = None
-        simulated_board[end_coordinate.y][end_coordinate.x] = piece_to_move
-
-        # Check if the move exposes the own king to check (i.e., not legal)
-        if self.is_king_in_check(simulated_board, current_player):
-            return False
+    def bitboard(self, kind: int, player: Player) -> int:
+        return self._board.bitboard(kind, player)
 
-        # Check if the moved piece is pinned
-        if self.is_pinned_piece(start_coordinate, end_coordinate, current_player):
-            return False
+    @property
+    def bitboards(self) -> list[int]:
+        # The board's own list, indexed by color * 6 + kind, it must not be modified
+        return self._board.bitboards
+
+    def move(
+        self,
+        coordinate: Coordinate,
+        user_selected_coordinate: Coordinate,
+        user_selected_piece: Piece,
+        promotion: Type[Piece] = Queen,
+    ):
+        self.make_move(self.create_move(coordinate, user_selected_coordinate, promotion))
+
+        if self.has_legal_moves(self.turn):
+            return
+
+        # Checkmate or stalemate
+        self._playable = False
+        if self.is_king_in_check(self.turn):
+            self.white_won = user_selected_piece.player.type == PlayerType.white
+            self.black_won = user_selected_piece.player.type == PlayerType.black
+
+    def create_move(self, start_coordinate: Coordinate, end_coordinate: Coordinate, promotion: Type[Piece] = Queen) -> Move:
+        piece = self[start_coordinate]
+        captured_piece = self[end_coordinate]
+        move = Move(start_coordinate, end_coordinate, piece, captured_piece)
+
+        if isinstance(piece, King):
+            move.castling = abs(end_coordinate.x - start_coordinate.x) == 2
+        elif isinstance(piece, Pawn):
+            if end_coordinate == self.en_passant and start_coordinate.x != end_coordinate.x:
+                move.en_passant = True
+                move.captured_piece = self[Coordinate.at(end_coordinate.x, start_coordinate.y)]
+            elif end_coordinate.y in (0, 7):
+                move.promotion = promotion(piece.player)
+
+        return move
+
+    def make_move(self, move: Move) -> None:
+        self._history.append((move, self.castling_rights, self.en_passant, self.halfmove_clock, self.hash_key))
+        old_square, new_square = move.old_square, move.new_square
+        placed_piece = move.promotion or move.moving_piece
+
+        # The hash is updated with the pieces that changed squares instead of being recomputed
+        hash_key = self.hash_key ^ BLACK_TO_MOVE_KEY ^ CASTLING_KEYS[self.castling_rights] ^ en_passant_key(self)
+        hash_key ^= piece_key(move.moving_piece, old_square.square) ^ piece_key(placed_piece, new_square.square)
+
+        self[old_square] = None
+        if move.en_passant:
+            captured_square = Coordinate.at(new_square.x, old_square.y)
+            hash_key ^= piece_key(move.captured_piece, captured_square.square)
+            self[captured_square] = None
+        elif move.captured_piece:
+            hash_key ^= piece_key(move.captured_piece, new_square.square)
+        self[new_square] = placed_piece
+
+        if move.castling:
+            rook_start, rook_end = self._castling_rook_squares(move)
+            rook = self[rook_start]
+            hash_key ^= piece_key(rook, rook_start.square) ^ piece_key(rook, rook_end.square)
+            self[rook_end] = rook
+            self[rook_start] = None
+
+        self.castling_rights &= CASTLING_RIGHTS_MASK[old_square.square] & CASTLING_RIGHTS_MASK[new_square.square]
+        self.en_passant = None
+        if isinstance(move.moving_piece, Pawn) and abs(new_square.y - old_square.y) == 2:
+            self.en_passant = Coordinate.at(old_square.x, (old_square.y + new_square.y) // 2)
+
+        if isinstance(move.moving_piece, King):
+            self._kings[move.moving_piece.player.type.index] = new_square
+
+        self.halfmove_clock += 1
+        if move.captured_piece or isinstance(move.moving_piece, Pawn):
+            self.halfmove_clock = 0
+        if self.turn.type == PlayerType.black:
+            self.fullmove_number += 1
+
+        self.turn = self.opponent(self.turn)
+        self.hash_key = hash_key ^ CASTLING_KEYS[self.castling_rights] ^ en_passant_key(self)
+
+    def unmake_move(self) -> Move:
+        move, castling_rights, en_passant, halfmove_clock, hash_key = self._history.pop()
+        old_square, new_square = move.old_square, move.new_square
+
+        if move.castling:
+            rook_start, rook_end = self._castling_rook_squares(move)
+            self[rook_start] = self[rook_end]
+            self[rook_end] = None
+
+        self[new_square] = None
+        if move.en_passant:
+            self[Coordinate.at(new_square.x, old_square.y)] = move.captured_piece
+        else:
+            self[new_square] = move.captured_piece
+        self[old_square] = move.moving_piece
+
+        if isinstance(move.moving_piece, King):
+            self._kings[move.moving_piece.player.type.index] = old_square
+
+        self.castling_rights = castling_rights
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        self.hash_key = hash_key
+        self.turn = self.opponent(self.turn)
+        if self.turn.type == PlayerType.black:
+            self.fullmove_number -= 1
+
+        return move
+
+    def is_repetition(self) -> bool:
+        # Only positions since the last capture or pawn move with the same side to move can repeat the current one
+        distance = min(self.halfmove_clock, len(self._history))
+        for ply in range(4, distance + 1, 2):
+            if self._history[-ply][4] == self.hash_key:
+                return True
 
-        return True
+        return False
+
+    @staticmethod
+    def _castling_rook_squares(move: Move) -> tuple[Coordinate, Coordinate]:
+        y = move.old_square.y
+        if move.new_square.x > move.old_square.x:
+            return Coordinate.at(7, y), Coordinate.at(5, y)
+        return Coordinate.at(0, y), Coordinate.at(3, y)
+
+    def is_move_legal(self, start_coordinate, end_coordinate, current_player):
+        return any(
+            move.old_square == start_coordinate and move.new_square == end_coordinate
+            for move in self.legal_moves(current_player)
+        )
 
     def is_pinned_piece(self, start_coordinate, end_coordinate, current_player):
-        # Check if the moved piece is pinned
-        piece_to_move = self._board[start_coordinate.y][start_coordinate.x]
-        king_coordinate = self.find_king_coordinate(self._board, current_player)
-
-        # Check if the piece is pinned along the line of sight to the king
-        for direction in piece_to_move.get_moves(start_coordinate, self):
-            # Check each square along the line of sight
-            temp_coordinate = start_coordinate + direction
-            while 0 <= temp_coordinate.x < 8 and 0 <= temp_coordinate.y < 8:
-                if temp_coordinate == end_coordinate:
-                    break  # Stop when reaching the destination square
-                elif self._board[temp_coordinate.y][temp_coordinate.x] is not None:
-                    # If there's a piece in the line of sight, check if it's an enemy piece
-                    blocking_piece = self._board[temp_coordinate.y][temp_coordinate.x]
-                    if blocking_piece.player != current_player:
-                        # Check if the blocking piece is a rook or queen, pinning the piece
-                        if isinstance(blocking_piece, Rook) or isinstance(blocking_piece, Queen):
-                            # The moved piece is pinned
-                            return True
-                    break  # Stop checking along the line of sight if there's a piece
-                temp_coordinate += direction
+        # Check if the moved piece is pinned and the move leaves the line between the king and the pinning piece
+        king_coordinate = self.find_king_coordinate(current_player)
+        own = self.occupancy(current_player)
+        pins = pin_rays(self._board.bitboards, own, self.occupied, current_player.type.index, king_coordinate.square)
 
-        return False
+        if (ray := pins.get(start_coordinate.square)) is None:
+            return False
+        return not ray >> end_coordinate.square & 1
 
-    def is_king_in_check(self, board: list[list[Piece | None]], player: Player) -> bool:
+    def is_king_in_check(self, player: Player) -> bool:
         # Check if the king of the specified player is in check
-        king_coordinate = self.find_king_coordinate(board, player)
-        opposing_player = self.white if player.type == PlayerType.black else self.black
+        king_coordinate = self.find_king_coordinate(player)
+        return self.is_square_attacked(king_coordinate.square, self.opponent(player))
 
-        # Check if any opposing player's piece can attack the king's coordinate
-        for row in board:
-            for piece in row:
-                if piece and piece.player == opposing_player:
-                    possible_moves = piece.get_moves(Coordinate(row.index(piece), board.index(row)), self)
-                    if king_coordinate in possible_moves:
-                        return True
+    def is_square_attacked(self, square: int, attacker: Player) -> bool:
+        return self.attackers(square, attacker) != 0
 
-        return False
+    def attackers(self, square: int, attacker: Player) -> int:
+        return attackers(self._board.bitboards, square, attacker.type.index, self.occupied)
 
-    @staticmethod
-    def find_king_coordinate(board: list[list[Piece | None]], player: Player) -> Coordinate:
-        # Find the coordinate of the king of the specified player
-        for row in board:
-            for piece in row:
-                if isinstance(piece, King) and piece.player == player:
-                    return Coordinate(row.index(piece), board.index(row))
+    def find_king_coordinate(self, player: Player) -> Coordinate:
+        # King squares are tracked by make_move and unmake_move
+        return self._kings[player.type.index]
+
+    def _find_king(self, player: Player) -> Coordinate | None:
+        for coordinate, piece in self._board.pieces():
+            if isinstance(piece, King) and piece.player == player:
+                return coordinate
 
     def in_checkmate(self, current_player) -> bool:
         # Check if the current player is in checkmate
         # A player is in checkmate if their king is in check, and there are no legal moves to get out of check
+        return self.is_king_in_check(current_player) and not self.has_legal_moves(current_player)
 
-        # Copy the current board to simulate each possible move
-        for row in self._board:
-            for piece in row:
-                if piece and piece.player == current_player:
-                    current_coordinate = Coordinate(row.index(piece), self._board.index(row))
-                    possible_moves = self.get_possible_moves_for_piece(piece, current_coordinate)
-                    for move in possible_moves:
-                        if self.is_move_legal(current_coordinate, move, current_player):
-                            return False
-
-        return True
+    def has_legal_moves(self, current_player) -> bool:
+        return len(self.legal_moves(current_player)) > 0
 
 
+from core.cache import MoveCache
 from core.coordinate import Coordinate
+from core.move import Move
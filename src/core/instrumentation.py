@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import functools
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from core.game import GameCore
+from core.pieces import PIECE_TYPES
+
+# Instrumented methods: the piece move functions, the legality checks, and the move generation and make/unmake
+# paths that replaced most of them in the search
+TARGETS: list[tuple[type, str]] = [
+    *((piece, 'get_moves') for piece in PIECE_TYPES),
+    (GameCore, 'is_move_legal'),
+    (GameCore, 'is_king_in_check'),
+    (GameCore, 'is_pinned_piece'),
+    (GameCore, 'in_checkmate'),
+    (GameCore, 'legal_moves'),
+    (GameCore, 'make_move'),
+    (GameCore, 'unmake_move'),
+]
+
+
+class Instrumentation:
+    # Counts calls and sums the time spent in the target methods. Enabling replaces the methods on their classes
+    # with timing wrappers and disabling puts the originals back, so there is no cost at all while disabled.
+    # Timers are inclusive: time in in_checkmate also counts for the is_king_in_check call it makes.
+    def __init__(self, targets: list[tuple[type, str]] = TARGETS):
+        self.targets = targets
+        self.calls: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+        self._originals: dict[tuple[type, str], Callable] = {}
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+
+        for owner, attribute in self.targets:
+            original = owner.__dict__[attribute]
+            self._originals[owner, attribute] = original
+            setattr(owner, attribute, self._wrap(f'{owner.__name__}.{attribute}', original))
+
+    def disable(self) -> None:
+        for (owner, attribute), original in self._originals.items():
+            setattr(owner, attribute, original)
+        self._originals = {}
+
+    def reset(self) -> None:
+        # Cleared in place, the wrappers hold on to these dictionaries
+        for owner, attribute in self.targets:
+            self.calls[f'{owner.__name__}.{attribute}'] = 0
+            self.seconds[f'{owner.__name__}.{attribute}'] = 0.0
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        return {
+            name: {
+                'calls': calls,
+                'seconds': self.seconds[name],
+                'microseconds_per_call': self.seconds[name] / calls * 1_000_000 if calls else 0.0,
+            }
+            for name, calls in self.calls.items()
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.stats(), indent=indent)
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        calls, seconds = self.calls, self.seconds
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+
+        return wrapper
+
+
+instrumentation = Instrumentation()
+
+
+@contextmanager
+def instrumented(reset: bool = True) -> Iterator[Instrumentation]:
+    # Collects statistics for the block, the instrumentation is left as it was found
+    was_enabled = instrumentation.enabled
+    if reset:
+        instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield instrumentation
+    finally:
+        if not was_enabled:
+            instrumentation.disable()
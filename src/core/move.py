@@ -1,12 +1,65 @@
 from dataclasses import dataclass
 
 from core.coordinate import Coordinate
-from core.pieces import Piece
+from core.pieces import Bishop, Knight, Piece, Queen, Rook
 
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+ALL_CASTLING_RIGHTS = WHITE_KINGSIDE | WHITE_QUEENSIDE | BLACK_KINGSIDE | BLACK_QUEENSIDE
 
-@dataclass
+# Castling rights that survive a move from or to a square, indexed by Coordinate.square
+CASTLING_RIGHTS_MASK = [ALL_CASTLING_RIGHTS] * 64
+CASTLING_RIGHTS_MASK[0] &= ~BLACK_QUEENSIDE
+CASTLING_RIGHTS_MASK[4] &= ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_RIGHTS_MASK[7] &= ~BLACK_KINGSIDE
+CASTLING_RIGHTS_MASK[56] &= ~WHITE_QUEENSIDE
+CASTLING_RIGHTS_MASK[60] &= ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_RIGHTS_MASK[63] &= ~WHITE_KINGSIDE
+
+# Packed moves are 16 bits: from square (6), to square (6), promotion piece (2), flag (2)
+PACKED_PROMOTIONS = [Knight, Bishop, Rook, Queen]
+NORMAL = 0
+PROMOTION = 1
+EN_PASSANT = 2
+CASTLING = 3
+
+
+@dataclass(slots=True)
 class Move:
     old_square: Coordinate
     new_square: Coordinate
     moving_piece: Piece
     captured_piece: Piece | None
+    promotion: Piece | None = None
+    castling: bool = False
+    en_passant: bool = False
+
+    def __str__(self) -> str:
+        promotion = self.promotion.code[1].lower() if self.promotion else ''
+        return f'{self.old_square.algebraic}{self.new_square.algebraic}{promotion}'
+
+    def pack(self) -> int:
+        if self.promotion:
+            flag, promotion = PROMOTION, self.promotion.kind - Knight.kind
+        else:
+            flag, promotion = EN_PASSANT if self.en_passant else CASTLING if self.castling else NORMAL, 0
+
+        return self.old_square.square | self.new_square.square << 6 | promotion << 12 | flag << 14
+
+
+def unpack_move(game: 'GameCore', packed: int) -> Move:
+    # The flag bits are not needed to rebuild the move, GameCore.create_move derives castling and en passant from
+    # the position
+    promotion = PACKED_PROMOTIONS[packed >> 12 & 3] if packed >> 14 == PROMOTION else Queen
+    return game.create_move(Coordinate.from_square(packed & 63), Coordinate.from_square(packed >> 6 & 63), promotion)
+
+
+def find_move(game: 'GameCore', notation: str | None) -> Move | None:
+    # Resolves UCI notation such as e7e8q against the legal moves of the side to move
+    for move in game.legal_moves():
+        if str(move) == notation:
+            return move
+
+    return None
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from core.attacks import (
+    BETWEEN, bishop_attacks, iter_squares, king_attacks, knight_attacks, pawn_attacks, queen_attacks, rook_attacks,
+)
+from core.coordinate import Coordinate
+from core.move import Move
+from core.pieces import Bishop, King, Knight, Queen, Rook
+from core.pieces.pawn import Pawn
+from core.player import Player, PlayerType
+from core.position import Position
+
+ALL_SQUARES = (1 << 64) - 1
+PROMOTIONS = [Queen.kind, Rook.kind, Bishop.kind, Knight.kind]
+SLIDER_ATTACKS = {Bishop.kind: bishop_attacks, Rook.kind: rook_attacks, Queen.kind: queen_attacks}
+
+# Pieces are shared per kind and color, indexed like Position.bitboards
+PIECES = [
+    piece(Player(player_type))
+    for player_type in (PlayerType.white, PlayerType.black)
+    for piece in (Pawn, Knight, Bishop, Rook, Queen, King)
+]
+
+# Move generation only reads its arguments and never touches pieces or the game, so it is safe to run on
+# snapshots from several threads and its results can be cached per position.
+
+
+def attackers(bitboards: Sequence[int], square: int, color: int, occupied: int) -> int:
+    # Look outward from the square with every piece's attack pattern, a piece of the same kind sitting at the
+    # end of such a ray attacks the square, so no moves of the attacking side have to be generated
+    offset = color * 6
+    queens = bitboards[offset + Queen.kind]
+
+    return (
+        pawn_attacks(square, 1 - color) & bitboards[offset + Pawn.kind]
+        | knight_attacks(square) & bitboards[offset + Knight.kind]
+        | king_attacks(square) & bitboards[offset + King.kind]
+        | bishop_attacks(square, occupied) & (bitboards[offset + Bishop.kind] | queens)
+        | rook_attacks(square, occupied) & (bitboards[offset + Rook.kind] | queens)
+    )
+
+
+def pin_rays(bitboards: Sequence[int], own: int, occupied: int, color: int, king_square: int) -> dict[int, int]:
+    # Maps the square of every pinned piece of the color to the squares it may still move to
+    offset = (1 - color) * 6
+    queens = bitboards[offset + Queen.kind]
+    snipers = (
+        rook_attacks(king_square, 0) & (bitboards[offset + Rook.kind] | queens)
+        | bishop_attacks(king_square, 0) & (bitboards[offset + Bishop.kind] | queens)
+    )
+
+    pins = {}
+    for sniper in iter_squares(snipers):
+        blockers = BETWEEN[king_square][sniper] & occupied
+        if blockers & own and not blockers & (blockers - 1):
+            pins[blockers.bit_length() - 1] = BETWEEN[king_square][sniper] | 1 << sniper
+
+    return pins
+
+
+def generate_legal_moves(position: Position, color: int | None = None, sources: int = ALL_SQUARES) -> list[Move]:
+    # Checkers, pins and the check evasion mask are computed once, after that every generated move is legal
+    if color is None:
+        color = position.color
+    enemy_color = 1 - color
+    bitboards = position.bitboards
+    own = position.occupancy[color]
+    enemy = position.occupancy[enemy_color]
+    occupied = own | enemy
+    king_square = position.king_square(color)
+    checkers = attackers(bitboards, king_square, enemy_color, occupied)
+    moves = []
+
+    if sources >> king_square & 1:
+        origin = Coordinate.from_square(king_square)
+        king = PIECES[color * 6 + King.kind]
+        without_king = occupied & ~(1 << king_square)
+        for target in iter_squares(king_attacks(king_square) & ~own):
+            if not attackers(bitboards, target, enemy_color, without_king) & ~(1 << target):
+                captured_piece = _captured_piece(bitboards, enemy, enemy_color, target)
+                moves.append(Move(origin, Coordinate.from_square(target), king, captured_piece))
+
+        if not checkers:
+            for right, path, target in King.CASTLING[color]:
+                passed = (king_square + target) // 2
+                if (
+                    position.castling_rights & right and not occupied & path
+                    and not attackers(bitboards, passed, enemy_color, occupied)
+                    and not attackers(bitboards, target, enemy_color, occupied)
+                ):
+                    moves.append(Move(origin, Coordinate.from_square(target), king, None, castling=True))
+
+    # In double check only the king can move
+    if checkers & (checkers - 1):
+        return moves
+
+    check_mask = ALL_SQUARES
+    if checkers:
+        check_mask = checkers | BETWEEN[king_square][checkers.bit_length() - 1]
+    pins = pin_rays(bitboards, own, occupied, color, king_square)
+
+    for kind in (Knight.kind, Bishop.kind, Rook.kind, Queen.kind):
+        piece = PIECES[color * 6 + kind]
+        for square in iter_squares(bitboards[color * 6 + kind] & sources):
+            if kind == Knight.kind:
+                targets = knight_attacks(square)
+            else:
+                targets = SLIDER_ATTACKS[kind](square, occupied)
+            targets &= ~own & check_mask & pins.get(square, ALL_SQUARES)
+
+            origin = Coordinate.from_square(square)
+            for target in iter_squares(targets):
+                captured_piece = _captured_piece(bitboards, enemy, enemy_color, target)
+                moves.append(Move(origin, Coordinate.from_square(target), piece, captured_piece))
+
+    pawn = PIECES[color * 6 + Pawn.kind]
+    step = -8 if color == 0 else 8
+    start_row = 6 if color == 0 else 1
+    en_passant = position.en_passant if color == position.color else None
+
+    for square in iter_squares(bitboards[color * 6 + Pawn.kind] & sources):
+        allowed = check_mask & pins.get(square, ALL_SQUARES)
+        targets = pawn_attacks(square, color) & enemy
+
+        if not occupied >> (square + step) & 1:
+            targets |= 1 << (square + step)
+            if square >> 3 == start_row and not occupied >> (square + 2 * step) & 1:
+                targets |= 1 << (square + 2 * step)
+
+        origin = Coordinate.from_square(square)
+        for target in iter_squares(targets & allowed):
+            captured_piece = _captured_piece(bitboards, enemy, enemy_color, target)
+            if target >> 3 in (0, 7):
+                for kind in PROMOTIONS:
+                    promotion = PIECES[color * 6 + kind]
+                    moves.append(Move(origin, Coordinate.from_square(target), pawn, captured_piece, promotion))
+            else:
+                moves.append(Move(origin, Coordinate.from_square(target), pawn, captured_piece))
+
+        # En passant removes two pieces from the same row, so the king's safety is verified with the final occupancy
+        if en_passant is not None and pawn_attacks(square, color) >> en_passant & 1:
+            captured_square = en_passant - step
+            after = occupied ^ (1 << square | 1 << en_passant | 1 << captured_square)
+            if not attackers(bitboards, king_square, enemy_color, after) & ~(1 << captured_square):
+                captured_piece = PIECES[enemy_color * 6 + Pawn.kind]
+                moves.append(Move(origin, Coordinate.from_square(en_passant), pawn, captured_piece, en_passant=True))
+
+    return moves
+
+
+def _captured_piece(bitboards: Sequence[int], enemy: int, enemy_color: int, square: int):
+    if not enemy >> square & 1:
+        return None
+
+    for index in range(enemy_color * 6, enemy_color * 6 + 6):
+        if bitboards[index] >> square & 1:
+            return PIECES[index]
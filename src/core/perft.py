@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+from core.epd import EpdStats, read_epd
+from core.fen import STARTING_FEN
+from core.game import GameCore
+
+
+@dataclass
+class ReferencePosition:
+    name: str
+    fen: str
+    # Known node counts, index 0 is depth 1
+    nodes: list[int]
+
+
+# https://www.chessprogramming.org/Perft_Results
+REFERENCE_POSITIONS = [
+    ReferencePosition('initial', STARTING_FEN, [20, 400, 8902, 197281, 4865609, 119060324]),
+    ReferencePosition(
+        'kiwipete',
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        [48, 2039, 97862, 4085603, 193690690],
+    ),
+    ReferencePosition('position 3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812, 43238, 674624, 11030083]),
+    ReferencePosition(
+        'position 4',
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    ReferencePosition(
+        'position 5',
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+        [44, 1486, 62379, 2103487, 89941194],
+    ),
+    ReferencePosition(
+        'position 6',
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+        [46, 2079, 89890, 3894594, 164075551],
+    ),
+]
+
+
+def perft(game: GameCore, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    moves = game.legal_moves()
+    # Bulk counting, the moves of the last ply are legal so they do not have to be played
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        game.make_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+
+    return nodes
+
+
+def divide(game: GameCore, depth: int) -> dict[str, int]:
+    # Node count below every root move, the usual way to narrow down a wrong perft result
+    results = {}
+    for move in game.legal_moves():
+        game.make_move(move)
+        results[str(move)] = perft(game, depth - 1)
+        game.unmake_move()
+
+    return results
+
+
+def run(game: GameCore, depth: int, show_divide: bool = False) -> tuple[int, float]:
+    start = time.perf_counter()
+    if show_divide:
+        results = divide(game, depth)
+        for move, nodes in sorted(results.items()):
+            print(f'{move}: {nodes}')
+        nodes = sum(results.values())
+    else:
+        nodes = perft(game, depth)
+
+    return nodes, time.perf_counter() - start
+
+
+def run_suite(depth: int) -> bool:
+    passed = True
+    total_nodes, total_time = 0, 0.0
+
+    for position in REFERENCE_POSITIONS:
+        position_depth = min(depth, len(position.nodes))
+        nodes, elapsed = run(GameCore.from_fen(position.fen), position_depth)
+        expected = position.nodes[position_depth - 1]
+        total_nodes += nodes
+        total_time += elapsed
+
+        status = 'ok' if nodes == expected else f'FAILED, expected {expected}'
+        passed &= nodes == expected
+        print(f'{position.name:>12} depth {position_depth}: {nodes:>10} nodes {elapsed:8.2f}s '
+              f'{nodes / elapsed:>10,.0f} nps  {status}')
+
+    print(f'{"total":>12}: {total_nodes:>18} nodes {total_time:8.2f}s {total_nodes / total_time:>10,.0f} nps')
+    return passed
+
+
+def run_epd(path: str, depth: int) -> bool:
+    # Checks every position of an EPD file against its D1..Dn operations up to the depth
+    positions, failures, total_nodes, total_time = 0, 0, 0, 0.0
+    stats = EpdStats()
+
+    for record in read_epd(path, stats):
+        game = GameCore(position=record.position)
+        positions += 1
+        for position_depth in range(1, depth + 1):
+            if (expected := record.operations.get(f'D{position_depth}')) is None:
+                continue
+
+            nodes, elapsed = run(game, position_depth)
+            total_nodes += nodes
+            total_time += elapsed
+            if nodes != int(expected):
+                failures += 1
+                print(f'line {record.line_number} depth {position_depth}: {nodes} nodes, expected {expected} '
+                      f'({record.fen})')
+
+    nps = total_nodes / total_time if total_time else 0
+    print(f'{positions} positions, {stats.skipped} skipped, {failures} failures, {total_nodes} nodes '
+          f'{total_time:.2f}s {nps:,.0f} nps')
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count the leaf nodes of the legal move tree of GameCore')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--fen', help='position to count, the bundled reference suite is run when omitted')
+    parser.add_argument('--epd', help='EPD file with D1..Dn perft operations to check instead of the bundled suite')
+    parser.add_argument('--divide', action='store_true', help='print the node count below every root move')
+    args = parser.parse_args()
+
+    if args.epd is not None:
+        sys.exit(0 if run_epd(args.epd, args.depth) else 1)
+    if args.fen is None:
+        sys.exit(0 if run_suite(args.depth) else 1)
+
+    nodes, elapsed = run(GameCore.from_fen(args.fen), args.depth, args.divide)
+    print(f'depth {args.depth}: {nodes} nodes in {elapsed:.2f}s ({nodes / elapsed:,.0f} nps)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Type
+
+from core.board import ArrayBoard
+from core.bitboard import BitboardBoard
+from core.game import GameCore
+from core.move import Move
+from core.pieces import Bishop, King, Knight, Queen, Rook
+from core.pieces.pawn import Pawn
+from core.position import Position
+
+RESULTS = {'1-0', '0-1', '1/2-1/2', '*'}
+PIECE_LETTERS = {'N': Knight.kind, 'B': Bishop.kind, 'R': Rook.kind, 'Q': Queen.kind, 'K': King.kind}
+
+TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*]')
+SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+MOVE_NUMBER = re.compile(r'\d+\.+')
+
+
+class PgnError(ValueError):
+    pass
+
+
+@dataclass
+class PgnGame:
+    tags: dict[str, str] = field(default_factory=dict)
+    # Moves in standard algebraic notation, comments, variations and annotations are dropped
+    moves: list[str] = field(default_factory=list)
+    result: str = '*'
+    line_number: int = 0
+
+
+@dataclass
+class PgnMove:
+    game_number: int
+    ply: int
+    san: str
+    move: Move
+    # Snapshot of the position after the move
+    position: Position
+
+
+@dataclass
+class ReplayStats:
+    games: int = 0
+    skipped: int = 0
+    moves: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+
+def read_games(path: str | os.PathLike) -> Iterator[PgnGame]:
+    # The file is read line by line and only the game being parsed is kept in memory
+    with open(path, encoding='utf-8', errors='replace') as file:
+        yield from parse_games(file)
+
+
+def parse_games(lines) -> Iterator[PgnGame]:
+    game = PgnGame()
+    in_movetext = False
+    # Nesting of {comments} and (variations) can span lines
+    comment, variation = False, 0
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not comment and not variation and line.startswith('['):
+            # A tag pair after movetext without a result starts the next game
+            if in_movetext:
+                yield game
+                game, in_movetext = PgnGame(), False
+            if not game.line_number:
+                game.line_number = line_number
+            if match := TAG.match(line):
+                game.tags[match.group(1)] = match.group(2).replace('\\"', '"')
+            continue
+
+        if not comment and (not line or line.startswith('%')):
+            continue
+
+        if not game.line_number:
+            game.line_number = line_number
+        in_movetext = True
+        for token in _tokenize(line):
+            if token == '{':
+                comment = True
+            elif token == '}':
+                comment = False
+            elif comment:
+                continue
+            elif token == ';':
+                break
+            elif token == '(':
+                variation += 1
+            elif token == ')':
+                variation = max(0, variation - 1)
+            elif variation or token.startswith('$'):
+                continue
+            elif token in RESULTS:
+                game.result = token
+                yield game
+                game, in_movetext = PgnGame(), False
+            elif token := MOVE_NUMBER.sub('', token):
+                game.moves.append(token)
+
+    if in_movetext and game.moves:
+        yield game
+
+
+def _tokenize(line: str) -> list[str]:
+    for char in '{}();':
+        line = line.replace(char, f' {char} ')
+    return line.split()
+
+
+def parse_san(game: GameCore, san: str) -> Move:
+    # Resolves a SAN move against the legal moves of the position
+    notation = san.rstrip('+#!?')
+    legal_moves = game.legal_moves()
+
+    if notation in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        kingside = len(notation) == 3
+        for move in legal_moves:
+            if move.castling and (move.new_square.x > move.old_square.x) == kingside:
+                return move
+        raise PgnError(f'Illegal castling {san!r}')
+
+    if not (match := SAN.fullmatch(notation)):
+        raise PgnError(f'Invalid SAN {san!r}')
+
+    letter, from_file, from_rank, target, promotion = match.groups()
+    kind = PIECE_LETTERS[letter] if letter else Pawn.kind
+    promotion_kind = PIECE_LETTERS[promotion] if promotion else None
+
+    candidates = [
+        move for move in legal_moves
+        if move.moving_piece.kind == kind
+        and move.new_square.algebraic == target
+        and (from_file is None or move.old_square.algebraic[0] == from_file)
+        and (from_rank is None or move.old_square.algebraic[1] == from_rank)
+        and (move.promotion.kind if move.promotion else None) == promotion_kind
+    ]
+    if len(candidates) != 1:
+        raise PgnError(f'{"Ambiguous" if candidates else "Illegal"} move {san!r}')
+
+    return candidates[0]
+
+
+def replay(pgn_game: PgnGame, board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard) -> Iterator[PgnMove]:
+    game = GameCore(board_type, pgn_game.tags.get('FEN'))
+    for ply, san in enumerate(pgn_game.moves, start=1):
+        move = parse_san(game, san)
+        game.make_move(move)
+        yield PgnMove(0, ply, san, move, game.position())
+
+
+def replay_games(
+    path: str | os.PathLike,
+    stats: ReplayStats | None = None,
+    board_type: Type[ArrayBoard | BitboardBoard] = BitboardBoard,
+) -> Iterator[PgnMove]:
+    # A game is only yielded once all of its moves resolved, malformed games are counted in stats and skipped
+    stats = stats if stats is not None else ReplayStats()
+
+    for game_number, pgn_game in enumerate(read_games(path), start=1):
+        try:
+            moves = list(replay(pgn_game, board_type))
+        except ValueError:
+            stats.skipped += 1
+            continue
+
+        stats.games += 1
+        stats.moves += len(moves)
+        for move in moves:
+            move.game_number = game_number
+            yield move
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a PGN file through GameCore and report the throughput')
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    stats = ReplayStats()
+    for _ in replay_games(args.path, stats):
+        pass
+
+    print(f'{stats.games} games, {stats.skipped} skipped, {stats.moves} moves in {stats.elapsed:.2f}s '
+          f'({stats.games_per_second:,.1f} games/s, {stats.moves / stats.elapsed:,.0f} moves/s)')
+
+
+if __name__ == '__main__':
+    main()
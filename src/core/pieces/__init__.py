@@ -1,7 +1,10 @@
 from core.pieces.bishop import Bishop
 from core.pieces.king import King
 from core.pieces.knight import Knight
-from core.pieces.pawn import Piece
+from core.pieces.pawn import Pawn
 from core.pieces.piece import Piece
 from core.pieces.queen import Queen
 from core.pieces.rook import Rook
+
+# Indexed by Piece.kind
+PIECE_TYPES = [Pawn, Knight, Bishop, Rook, Queen, King]
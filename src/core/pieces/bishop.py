@@ -1,57 +1,14 @@
 from core import Coordinate
+from core.attacks import bishop_attacks, to_coordinates
 from core.pieces.piece import Piece
 
 
 class Bishop(Piece):
     code = 'B'
+    kind = 2
     value = 3
 
     def get_moves(self, initial_coordinate: Coordinate, game: 'GameCore') -> list[Coordinate]:
-        coordinates = []
+        attacks = bishop_attacks(initial_coordinate.square, game.occupied)
+        return to_coordinates(attacks & ~game.occupancy(self.player))
 
-        # Upper right
-        for i in range(1, 8):
-            if coordinate := self._get_move(initial_coordinate, game, i, i):
-                coordinates.append(coordinate)
-            else:
-                break
-
-        self.captured = False
-        # Upper left
-        for i in range(1, 8):
-            if coordinate := self._get_move(initial_coordinate, game, -i, i):
-                coordinates.append(coordinate)
-            else:
-                break
-
-        self.captured = False
-        # Bottom right
-        for i in range(1, 8):
-            if coordinate := self._get_move(initial_coordinate, game, i, -i):
-                coordinates.append(coordinate)
-            else:
-                break
-
-        self.captured = False
-        # Bottom left
-        for i in range(1, 8):
-            if coordinate := self._get_move(initial_coordinate, game, -i, -i):
-                coordinates.append(coordinate)
-            else:
-                break
-
-        self.captured = False
-        return coordinates
-
-    # def _get_move(self, initial_coordinate: Coordinate, game: 'GameCore', x: int, y: int) -> Coordinate | None:
-    #     coordinate = Coordinate.shift(self.player, initial_coordinate, x, y)
-    #     if not coordinate:
-    #         return
-    #
-    #     if game[coordinate] is not None:
-    #         if Piece.is_coordinate_capturable(game, coordinate, self.player):
-    #             self.captured = True
-    #             return coordinate
-    #         return
-    #
-    #     return coordinate
@@ -1,21 +1,26 @@
 from core import Coordinate
+from core.attacks import king_attacks, to_coordinates
 from core.pieces.piece import Piece
 
 
 class King(Piece):
     code = 'K'
+    kind = 5
     value = 100
 
+    # (castling right, squares that must be empty, king target) for each side, see core.move
+    CASTLING = [
+        [(1, 0b01100000 << 56, 62), (2, 0b00001110 << 56, 58)],
+        [(4, 0b01100000, 6), (8, 0b00001110, 2)],
+    ]
+
     def get_moves(self, initial_coordinate: 'Coordinate', game: 'GameCore') -> list['Coordinate']:
-        coordinates = [
-            self._get_move(initial_coordinate, game, 0, 1),
-            self._get_move(initial_coordinate, game, 0, -1),
-            self._get_move(initial_coordinate, game, 1, 0),
-            self._get_move(initial_coordinate, game, -1, 0),
-            self._get_move(initial_coordinate, game, 1, -1),
-            self._get_move(initial_coordinate, game, -1, 1),
-            self._get_move(initial_coordinate, game, 1, 1),
-            self._get_move(initial_coordinate, game, -1, -1),
-        ]
+        attacks = king_attacks(initial_coordinate.square)
+        targets = attacks & ~game.occupancy(self.player)
+
+        # Castling, the king is not allowed to pass through check which is verified by GameCore.is_move_legal
+        for right, path, target in self.CASTLING[self.player.type.index]:
+            if game.castling_rights & right and not game.occupied & path:
+                targets |= 1 << target
 
-        return [coordinate for coordinate in coordinates if coordinate]
+        return to_coordinates(targets)
@@ -1,21 +1,13 @@
 from core import Coordinate
+from core.attacks import knight_attacks, to_coordinates
 from core.pieces.piece import Piece
 
 
 class Knight(Piece):
     code = 'N'
+    kind = 1
     value = 3
 
     def get_moves(self, initial_coordinate: 'Coordinate', game: 'GameCore') -> list['Coordinate']:
-        coordinates = [
-            self._get_move(initial_coordinate, game, 1, 2),
-            self._get_move(initial_coordinate, game, 1, -2),
-            self._get_move(initial_coordinate, game, -1, 2),
-            self._get_move(initial_coordinate, game, -1, -2),
-            self._get_move(initial_coordinate, game, 2, 1),
-            self._get_move(initial_coordinate, game, 2, -1),
-            self._get_move(initial_coordinate, game, -2, 1),
-            self._get_move(initial_coordinate, game, -2, -1),
-        ]
-
-        return [coordinate for coordinate in coordinates if coordinate]
+        attacks = knight_attacks(initial_coordinate.square)
+        return to_coordinates(attacks & ~game.occupancy(self.player))
@@ -1,33 +1,32 @@
+from core.attacks import pawn_attacks, to_coordinates
 from core.coordinate import Coordinate
 from core.pieces.piece import Piece
 
 
 class Pawn(Piece):
     code = 'p'
+    kind = 0
     value = 1
 
     def get_moves(self, initial_coordinate: Coordinate, game: 'GameCore') -> list[Coordinate]:
-        coordinates = []
-
-        # Move forward by 2
-        coordinate = Coordinate.shift(self.player, initial_coordinate, 0, 1)
-        if coordinate and game[coordinate] is None:
-            coordinates = [coordinate]
-
-        # Move forward by 2
-        if not self.moved:
-            coordinate = Coordinate.shift(self.player, initial_coordinate, 0, 2)
-            if coordinate and game[coordinate] is None:
-                coordinates.append(coordinate)
-
-        # Capture left
-        coordinate = Coordinate.shift(self.player, initial_coordinate, -1, 1)
-        if coordinate and Piece.is_coordinate_capturable(game, coordinate, self.player):
-            coordinates.append(coordinate)
-
-        # Capture right
-        coordinate = Coordinate.shift(self.player, initial_coordinate, 1, 1)
-        if coordinate and Piece.is_coordinate_capturable(game, coordinate, self.player):
-            coordinates.append(coordinate)
-
-        return coordinates
+        square = initial_coordinate.square
+        color = self.player.type.index
+        step = -8 if color == 0 else 8
+        occupied = game.occupied
+        targets = 0
+
+        # Move forward by 1
+        if 0 <= square + step < 64 and not occupied >> (square + step) & 1:
+            targets |= 1 << (square + step)
+
+            # Move forward by 2
+            if square >> 3 == (6 if color == 0 else 1) and not occupied >> (square + 2 * step) & 1:
+                targets |= 1 << (square + 2 * step)
+
+        # Captures, including en passant
+        enemies = game.occupancy(game.opponent(self.player))
+        if game.en_passant is not None and game.turn == self.player:
+            enemies |= 1 << game.en_passant.square
+        targets |= pawn_attacks(square, color) & enemies
+
+        return to_coordinates(targets)
@@ -3,32 +3,33 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 
 from core import Coordinate
-from core.player import Player
+from core.player import Player, PlayerType
 
 
 class Piece(ABC):
     value: int
     code: str
-    moved: bool = False
+    kind: int
     player: Player
 
-    def __init__(self, player: Player):
-        self.player = player
-        self.code = player.type.value[0] + self.code
-        self.captured = False
+    # A piece has no state besides its kind and color, so the constructor hands out one shared instance per pair
+    # and boards, moves and promotions never allocate pieces
+    _instances: dict[tuple[type[Piece], PlayerType], Piece] = {}
 
-    def _get_move(self, initial_coordinate: Coordinate, game: 'GameCore', x: int, y: int) -> Coordinate | None:
-        coordinate = Coordinate.shift(self.player, initial_coordinate, x, y)
-        if not coordinate:
-            return
+    def __new__(cls, player: Player):
+        if (piece := Piece._instances.get((cls, player.type))) is None:
+            piece = super().__new__(cls)
+            object.__setattr__(piece, 'player', player)
+            object.__setattr__(piece, 'code', player.type.value[0] + cls.code)
+            Piece._instances[cls, player.type] = piece
 
-        if game[coordinate] is not None:
-            if not self.captured and Piece.is_coordinate_capturable(game, coordinate, self.player):
-                self.captured = True
-                return coordinate
-            return
+        return piece
 
-        return coordinate
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __reduce__(self):
+        return self.__class__, (self.player,)
 
     @abstractmethod
     def get_moves(self, initial_coordinate: 'Coordinate', game: 'GameCore') -> list['Coordinate']:
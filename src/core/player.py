@@ -6,7 +6,12 @@ class PlayerType(Enum):
     white = 'white'
     black = 'black'
 
+    @property
+    def index(self) -> int:
+        return 0 if self is PlayerType.white else 1
 
-@dataclass
+
+# Players are shared by every GameCore and piece, so they must stay immutable
+@dataclass(frozen=True, slots=True)
 class Player:
     type: PlayerType
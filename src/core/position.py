@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+# Immutable snapshot of everything move generation depends on. Snapshots are hashable and share nothing with the
+# GameCore they were taken from, so they can be handed to other threads or used as cache keys.
+class Position(NamedTuple):
+    # Indexed by color * 6 + Piece.kind, see core.bitboard
+    bitboards: tuple[int, ...]
+    # Indexed by PlayerType.index
+    occupancy: tuple[int, int]
+    # PlayerType.index of the side to move
+    color: int
+    castling_rights: int
+    # Coordinate.square behind a pawn that just moved two squares, or None
+    en_passant: int | None
+    hash_key: int
+
+    @property
+    def occupied(self) -> int:
+        return self.occupancy[0] | self.occupancy[1]
+
+    def king_square(self, color: int) -> int:
+        return self.bitboards[color * 6 + 5].bit_length() - 1
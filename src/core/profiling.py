@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import pstats
+import time
+import tracemalloc
+from typing import Callable
+
+from core.fen import STARTING_FEN
+from core.game import GameCore
+from core.instrumentation import instrumented
+from core.perft import perft
+from core.pgn import replay_games
+
+
+def profile(
+    workload: Callable[[], object],
+    use_cprofile: bool = True,
+    use_tracemalloc: bool = False,
+    instrument: bool = False,
+    top: int = 20,
+    output: str | None = None,
+) -> None:
+    # Runs the workload once under the selected tools and prints their reports. cProfile and tracemalloc slow the
+    # run down considerably, so the elapsed time is only comparable between runs with the same tools.
+    profiler = cProfile.Profile() if use_cprofile else None
+    if use_tracemalloc:
+        tracemalloc.start(10)
+
+    # Without instrument the wrappers are left as they are, instrumentation enabled elsewhere stays enabled
+    with instrumented() if instrument else contextlib.nullcontext() as instrumentation:
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            workload()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+
+    print(f'elapsed {elapsed:.3f}s')
+
+    if instrument:
+        print('\ninstrumented calls:')
+        for name, stats in instrumentation.stats().items():
+            if stats['calls']:
+                print(f'{name:>26}: {stats["calls"]:>10,} calls {stats["seconds"]:>9.3f}s '
+                      f'{stats["microseconds_per_call"]:>9.1f}us/call')
+
+    if profiler is not None:
+        print()
+        statistics = pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+        statistics.print_stats(top)
+        if output is not None:
+            statistics.dump_stats(output)
+
+    if use_tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'memory: {current / 1024:,.0f} KiB still allocated, {peak / 1024:,.0f} KiB peak')
+        for statistic in snapshot.statistics('lineno')[:top]:
+            print(statistic)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile a perft or game replay run')
+    subparsers = parser.add_subparsers(dest='workload', required=True)
+    perft_parser = subparsers.add_parser('perft', help='count the leaf nodes of a position')
+    perft_parser.add_argument('--fen', default=STARTING_FEN)
+    perft_parser.add_argument('--depth', type=int, default=3)
+    replay_parser = subparsers.add_parser('replay', help='replay the games of a PGN file')
+    replay_parser.add_argument('path')
+
+    parser.add_argument('--no-cprofile', action='store_true')
+    parser.add_argument('--tracemalloc', action='store_true', help='report the lines that allocated the most memory')
+    parser.add_argument('--instrument', action='store_true', help='count and time the core hot paths')
+    parser.add_argument('--top', type=int, default=20, help='number of entries in the reports')
+    parser.add_argument('--output', help='write the cProfile statistics to this file')
+    args = parser.parse_args()
+
+    def run_perft():
+        game = GameCore.from_fen(args.fen)
+        print(f'perft {args.depth}: {perft(game, args.depth)} nodes')
+
+    def run_replay():
+        print(f'replay: {sum(1 for _ in replay_games(args.path))} moves')
+
+    workload = run_perft if args.workload == 'perft' else run_replay
+
+    profile(workload, not args.no_cprofile, args.tracemalloc, args.instrument, args.top, args.output)
+
+
+if __name__ == '__main__':
+    main()
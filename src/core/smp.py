@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+
+from core.engine import Engine, SearchResult
+from core.fen import STARTING_FEN
+from core.game import GameCore
+from core.move import find_move
+from core.transposition import TranspositionTable, table_words
+
+# Seconds between checks for workers that died without reporting a result
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class ParallelResult(SearchResult):
+    workers: int = 1
+    # Nodes searched by every worker, the first one is the main worker
+    worker_nodes: list[int] = field(default_factory=list)
+
+
+def _worker(
+    index: int,
+    fen: str,
+    table_name: str,
+    memory_mb: float,
+    generation: int,
+    limits: tuple[int, int | None, float | None],
+    stop_event,
+    results,
+) -> None:
+    memory = SharedMemory(table_name)
+    words = memory.buf[:table_words(memory_mb) * 8].cast('Q')
+    try:
+        # Every worker starts from the same generation, so new_search() keeps them in agreement about which
+        # entries are from this search
+        table = TranspositionTable(memory_mb, words)
+        table.generation = generation
+        engine = Engine(GameCore.from_fen(fen), table, stop_event)
+        max_depth, max_nodes, time_limit = limits
+        # Helpers start one iteration ahead on every other worker, so that the workers are spread over two depths
+        # and fill the shared table with entries the others can use instead of repeating the same tree
+        result = engine.search(max_depth, max_nodes, time_limit, start_depth=1 + index % 2)
+        report = (str(result.move) if result.move else None, result.score, result.depth, engine.nodes)
+        results.put((index, None, report))
+    except Exception as error:
+        # The coordinator waits for a report from every worker, so failures are reported instead of dying silently
+        results.put((index, f'{type(error).__name__}: {error}', None))
+    finally:
+        words.release()
+        memory.close()
+
+
+class ParallelEngine:
+    # Lazy SMP: every worker process searches the same root position and the workers only communicate through the
+    # transposition table, which lives in shared memory
+    def __init__(self, game: GameCore, workers: int | None = None, memory_mb: float = 16):
+        self.game = game
+        self.workers = workers or multiprocessing.cpu_count()
+        self.memory_mb = memory_mb
+        self._memory = SharedMemory(create=True, size=table_words(memory_mb) * 8)
+        self._memory.buf[:] = bytes(self._memory.size)
+        self._generation = 0
+
+    def close(self) -> None:
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> ParallelEngine:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def clear(self) -> None:
+        self._memory.buf[:] = bytes(self._memory.size)
+
+    def search(
+        self,
+        max_depth: int = 64,
+        max_nodes: int | None = None,
+        time_limit: float | None = None,
+    ) -> ParallelResult:
+        start = time.perf_counter()
+        context = multiprocessing.get_context()
+        stop_event = context.Event()
+        results = context.Queue()
+        fen = self.game.to_fen()
+
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(
+                    index, fen, self._memory.name, self.memory_mb, self._generation,
+                    (max_depth, max_nodes, time_limit), stop_event, results,
+                ),
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        # The search is over as soon as the main worker finishes, the helpers are then stopped and their results
+        # only count if they got deeper
+        reports = {}
+        try:
+            while 0 not in reports:
+                self._receive(processes, results, reports)
+            stop_event.set()
+            while len(reports) < self.workers:
+                self._receive(processes, results, reports)
+        except BaseException:
+            # The search failed, the remaining workers are not waited for
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+        self._generation = (self._generation + 1) & 0x3F
+
+        best_index = max(reports, key=lambda index: (reports[index][2], index == 0, reports[index][1]))
+        move, score, depth, _ = reports[best_index]
+        worker_nodes = [reports[index][3] for index in range(self.workers)]
+        return ParallelResult(
+            move=find_move(self.game, move),
+            score=score,
+            depth=depth,
+            nodes=sum(worker_nodes),
+            elapsed=time.perf_counter() - start,
+            workers=self.workers,
+            worker_nodes=worker_nodes,
+        )
+
+    @staticmethod
+    def _receive(processes: list, results, reports: dict[int, tuple]) -> None:
+        try:
+            index, error, report = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            # A worker that was killed or failed before it could report would otherwise block the search forever
+            for index, process in enumerate(processes):
+                if index not in reports and process.exitcode not in (None, 0):
+                    raise RuntimeError(f'Search worker {index} exited with code {process.exitcode}')
+            return
+
+        if error is not None:
+            raise RuntimeError(f'Search worker {index} failed: {error}')
+        reports[index] = report
+
+
+def measure_speedup(game: GameCore, depth: int, workers: int, memory_mb: float = 16) -> tuple[float, float]:
+    # Time to reach a fixed depth with a single worker and with the given number of workers, from an empty table
+    times = []
+    for count in (1, workers):
+        with ParallelEngine(game, count, memory_mb) as engine:
+            times.append(engine.search(max_depth=depth).elapsed)
+
+    return times[0], times[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lazy SMP search and its speedup over a single worker')
+    parser.add_argument('--fen', default=STARTING_FEN)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--memory', type=float, default=16, help='transposition table size in MB')
+    args = parser.parse_args()
+
+    game = GameCore.from_fen(args.fen)
+    with ParallelEngine(game, args.workers, args.memory) as engine:
+        result = engine.search(max_depth=args.depth)
+    print(f'depth {result.depth} score {result.score} move {result.move} nodes {result.nodes} '
+          f'time {result.elapsed:.2f}s workers {result.workers} worker nodes {result.worker_nodes}')
+
+    single, parallel = measure_speedup(game, args.depth, args.workers, args.memory)
+    print(f'1 worker {single:.2f}s, {args.workers} workers {parallel:.2f}s, speedup {single / parallel:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
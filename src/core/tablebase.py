@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from core.attacks import KING_ATTACKS, PAWN_ATTACKS, iter_squares, queen_attacks, rook_attacks
+from core.pieces import Queen, Rook
+from core.pieces.pawn import Pawn
+
+# Tables for a king and one piece against a lone king. The side with the piece is always stored as white; positions
+# where black has the piece are probed with the board mirrored and the colors swapped.
+# Position index: side to move (1), white king (6), black king (6), piece square (6), squares as in Coordinate.square
+MATERIALS = {'KQK': Queen.kind, 'KRK': Rook.kind, 'KPK': Pawn.kind}
+# KPK positions where the pawn promotes continue in these tables
+PROMOTION_TABLES = {Queen.kind: 'KQK', Rook.kind: 'KRK'}
+SIZE = 2 * 64 * 64 * 64
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+ILLEGAL = 3
+
+# File layout: header, then the result of every position in 2 bits, four to a byte, then the distance to mate of
+# every position in one byte, in plies. A win is always an odd and a loss an even number of plies from mate.
+HEADER = struct.Struct('<4s4sI')
+MAGIC = b'CTB1'
+RESULTS_OFFSET = HEADER.size
+DISTANCES_OFFSET = RESULTS_OFFSET + SIZE // 4
+FILE_SIZE = DISTANCES_OFFSET + SIZE
+
+
+class TablebaseResult(NamedTuple):
+    # 1 if the side to move wins, -1 if it loses, 0 for a draw
+    wdl: int
+    # Plies to mate with best play, 0 for a draw
+    dtm: int
+
+
+def position_index(color: int, white_king: int, black_king: int, piece: int) -> int:
+    return ((color << 6 | white_king) << 6 | black_king) << 6 | piece
+
+
+def table_path(directory: str | os.PathLike, material: str) -> str:
+    return os.path.join(directory, f'{material}.tb')
+
+
+def _piece_attacks(kind: int, square: int, occupied: int) -> int:
+    if kind == Queen.kind:
+        return queen_attacks(square, occupied)
+    if kind == Rook.kind:
+        return rook_attacks(square, occupied)
+    return PAWN_ATTACKS[0][square]
+
+
+def _is_legal(kind: int, color: int, white_king: int, black_king: int, piece: int) -> bool:
+    if white_king == black_king or piece in (white_king, black_king) or KING_ATTACKS[white_king] >> black_king & 1:
+        return False
+    if kind == Pawn.kind and piece >> 3 in (0, 7):
+        return False
+
+    # With white to move black must not be in check, white can never be in check from a lone king
+    occupied = 1 << white_king | 1 << black_king | 1 << piece
+    return color == 1 or not _piece_attacks(kind, piece, occupied) >> black_king & 1
+
+
+class _Analysis(NamedTuple):
+    legal: bytes
+    # Moves to positions of the same table
+    moves: bytes
+    # 1 if a move leaves the table for a draw: capturing the piece or an under-promotion
+    draw_exits: bytes
+    # 1 if the side to move is checkmated
+    mated: bytes
+    # Plies to mate through a promotion into another table, 0 if there is none
+    promotion_wins: array
+
+
+def _analyse_slice(material: str, color: int, white_king: int, directory: str) -> _Analysis:
+    # Looks at the moves of the 4096 positions with the given side to move and white king. Slices are independent,
+    # so they are spread over processes.
+    kind = MATERIALS[material]
+    promotion_tables = [
+        _Table(table_path(directory, name)) for name in PROMOTION_TABLES.values()
+    ] if kind == Pawn.kind else []
+
+    legal, moves, draw_exits, mated = bytearray(4096), bytearray(4096), bytearray(4096), bytearray(4096)
+    promotion_wins = array('H', [0]) * 4096
+
+    for black_king in range(64):
+        for piece in range(64):
+            slot = black_king << 6 | piece
+            if not _is_legal(kind, color, white_king, black_king, piece):
+                continue
+
+            legal[slot] = 1
+            occupied = 1 << white_king | 1 << black_king | 1 << piece
+            if color == 0:
+                king_targets = KING_ATTACKS[white_king] & ~KING_ATTACKS[black_king] & ~(1 << piece)
+                count = king_targets.bit_count()
+                if kind != Pawn.kind:
+                    count += (_piece_attacks(kind, piece, occupied) & ~(1 << white_king)).bit_count()
+                elif not occupied >> (piece - 8) & 1:
+                    if piece - 8 < 8:
+                        # Queen and rook promotions continue in their tables with black to move, knight and
+                        # bishop promotions are draws
+                        draw_exits[slot] = 1
+                        for table in promotion_tables:
+                            wdl, dtm = table.probe(position_index(1, white_king, black_king, piece - 8))
+                            if wdl == -1 and (not promotion_wins[slot] or dtm + 1 < promotion_wins[slot]):
+                                promotion_wins[slot] = dtm + 1
+                    else:
+                        count += 1
+                        if piece >> 3 == 6 and not occupied >> (piece - 16) & 1:
+                            count += 1
+            else:
+                # The king does not block attacks along the line it moves on
+                attacked = _piece_attacks(kind, piece, occupied & ~(1 << black_king))
+                targets = KING_ATTACKS[black_king] & ~KING_ATTACKS[white_king] & ~attacked
+                if targets >> piece & 1:
+                    draw_exits[slot] = 1
+                    targets &= ~(1 << piece)
+                count = targets.bit_count()
+                if not count and not draw_exits[slot] and attacked >> black_king & 1:
+                    mated[slot] = 1
+
+            moves[slot] = count
+
+    for table in promotion_tables:
+        table.close()
+    return _Analysis(bytes(legal), bytes(moves), bytes(draw_exits), bytes(mated), promotion_wins)
+
+
+def _predecessors(kind: int, index: int, legal: bytearray) -> list[int]:
+    # Legal positions one move before this one, by moves that stay in the table
+    piece, black_king, white_king, color = index & 63, index >> 6 & 63, index >> 12 & 63, index >> 18
+    occupied = 1 << white_king | 1 << black_king | 1 << piece
+    empty = ~occupied
+
+    if color == 0:
+        # Black just moved its king
+        candidates = [
+            position_index(1, white_king, origin, piece)
+            for origin in iter_squares(KING_ATTACKS[black_king] & empty)
+        ]
+    else:
+        candidates = [
+            position_index(0, origin, black_king, piece) for origin in iter_squares(KING_ATTACKS[white_king] & empty)
+        ]
+        if kind != Pawn.kind:
+            origins = _piece_attacks(kind, piece, occupied) & empty
+        else:
+            origins = 0
+            if piece >> 3 <= 5 and empty >> (piece + 8) & 1:
+                origins |= 1 << (piece + 8)
+                if piece >> 3 == 4 and empty >> (piece + 16) & 1:
+                    origins |= 1 << (piece + 16)
+        candidates += [position_index(0, white_king, black_king, origin) for origin in iter_squares(origins)]
+
+    return [candidate for candidate in candidates if legal[candidate]]
+
+
+def generate(material: str, directory: str | os.PathLike, workers: int = 1) -> dict[str, int]:
+    # Retrograde analysis: starting from the checkmates, a position is won at n + 1 plies if a move reaches a
+    # position lost at n, and lost at n + 1 if every move reaches a won position, the slowest one at n.
+    # KPK needs the KQK and KRK tables in the same directory.
+    kind = MATERIALS[material]
+    directory = os.fspath(directory)
+
+    slices = [(material, color, white_king, directory) for color in (0, 1) for white_king in range(64)]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            analyses = list(executor.map(_analyse_slice, *zip(*slices)))
+    else:
+        analyses = [_analyse_slice(*arguments) for arguments in slices]
+
+    legal = bytearray(b''.join(analysis.legal for analysis in analyses))
+    remaining = bytearray(b''.join(analysis.moves for analysis in analyses))
+    draw_exits = b''.join(analysis.draw_exits for analysis in analyses)
+    mated = b''.join(analysis.mated for analysis in analyses)
+    wins = array('H', b''.join(analysis.promotion_wins.tobytes() for analysis in analyses))
+
+    results = bytearray(SIZE)
+    distances = bytearray(SIZE)
+    # Positions are decided in order of their distance to mate, wins come from odd and losses from even buckets
+    buckets: list[list[int]] = [[index for index in range(SIZE) if mated[index]]]
+    for index in range(SIZE):
+        if wins[index]:
+            while len(buckets) <= wins[index]:
+                buckets.append([])
+            buckets[wins[index]].append(index)
+
+    distance = 0
+    while distance < len(buckets):
+        for index in buckets[distance]:
+            if results[index] or distance % 2 and wins[index] != distance:
+                continue
+
+            results[index] = WIN if distance % 2 else LOSS
+            distances[index] = min(distance, 255)
+            if len(buckets) <= distance + 1:
+                buckets.append([])
+
+            for predecessor in _predecessors(kind, index, legal):
+                if results[predecessor]:
+                    continue
+                if results[index] == LOSS:
+                    if not wins[predecessor] or wins[predecessor] > distance + 1:
+                        wins[predecessor] = distance + 1
+                        buckets[distance + 1].append(predecessor)
+                else:
+                    remaining[predecessor] -= 1
+                    if not remaining[predecessor] and not draw_exits[predecessor] and not wins[predecessor]:
+                        buckets[distance + 1].append(predecessor)
+        buckets[distance] = []
+        distance += 1
+
+    for index in range(SIZE):
+        if not legal[index]:
+            results[index] = ILLEGAL
+
+    packed = bytearray(SIZE // 4)
+    for index in range(0, SIZE, 4):
+        packed[index >> 2] = (
+            results[index] | results[index + 1] << 2 | results[index + 2] << 4 | results[index + 3] << 6
+        )
+
+    os.makedirs(directory, exist_ok=True)
+    with open(table_path(directory, material), 'wb') as file:
+        file.write(HEADER.pack(MAGIC, material.encode().ljust(4, b'\0'), SIZE))
+        file.write(packed)
+        file.write(distances)
+
+    return {
+        'legal': sum(legal),
+        'wins': results.count(WIN),
+        'losses': results.count(LOSS),
+        'draws': results.count(DRAW),
+        'longest_mate': max(distances),
+    }
+
+
+class _Table:
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, size = HEADER.unpack_from(self._data)
+        if magic != MAGIC or size != SIZE or len(self._data) != FILE_SIZE:
+            self.close()
+            raise ValueError(f'{path} is not a tablebase file')
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+    def probe(self, index: int) -> tuple[int, int]:
+        result = self._data[RESULTS_OFFSET + (index >> 2)] >> ((index & 3) << 1) & 3
+        if result == WIN:
+            return 1, self._data[DISTANCES_OFFSET + index]
+        if result == LOSS:
+            return -1, self._data[DISTANCES_OFFSET + index]
+        return 0, 0
+
+
+class Tablebase:
+    # Tables are memory-mapped when first probed, a probe reads two bytes of the file
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = os.fspath(directory)
+        self._tables: dict[str, _Table | None] = {}
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables = {}
+
+    def __enter__(self) -> Tablebase:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _table(self, material: str) -> _Table | None:
+        if material not in self._tables:
+            path = table_path(self.directory, material)
+            self._tables[material] = _Table(path) if os.path.exists(path) else None
+        return self._tables[material]
+
+    def probe(self, game: 'GameCore') -> TablebaseResult | None:
+        # None unless the position is a king and a queen, rook or pawn against a lone king with a table available
+        if game.occupied.bit_count() != 3 or game.castling_rights:
+            return None
+
+        bitboards = game.bitboards
+        for material, kind in MATERIALS.items():
+            for color in (0, 1):
+                if bitboards[color * 6 + kind]:
+                    break
+            else:
+                continue
+
+            if (table := self._table(material)) is None:
+                return None
+
+            piece = bitboards[color * 6 + kind].bit_length() - 1
+            kings = [bitboards[king_color * 6 + 5].bit_length() - 1 for king_color in (0, 1)]
+            turn = game.turn.type.index
+            if color == 1:
+                # Black has the piece: flip the board vertically and swap the colors
+                piece, kings, turn = piece ^ 56, [kings[1] ^ 56, kings[0] ^ 56], turn ^ 1
+
+            return TablebaseResult(*table.probe(position_index(turn, kings[0], kings[1], piece)))
+
+        return None
+
+
+def generate_all(directory: str | os.PathLike, workers: int = 1) -> None:
+    # KQK and KRK first, KPK promotes into them
+    for material in ('KQK', 'KRK', 'KPK'):
+        start = time.perf_counter()
+        stats = generate(material, directory, workers)
+        print(f'{material}: {stats["legal"]} legal positions, {stats["wins"]} wins, {stats["losses"]} losses, '
+              f'{stats["draws"]} draws, longest mate {stats["longest_mate"]} plies in '
+              f'{time.perf_counter() - start:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the KQK, KRK and KPK endgame tables')
+    parser.add_argument('directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    generate_all(args.directory, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from array import array
+from typing import NamedTuple
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Every entry is two unsigned 64-bit words: the position key XOR the data word, then the data word.
+# Data word layout, low bits first:
+#   move (16): Move.pack()
+#   score (32): stored with an offset of 2 ** 31
+#   depth (7), bound (2), generation (6)
+# Storing the key XOR the data lets a reader detect an entry torn by a concurrent writer, which turns such an
+# entry into a plain miss instead of a corrupted hit.
+SCORE_OFFSET = 1 << 31
+ENTRY_BYTES = 16
+# Entries are grouped in buckets of two: a depth-preferred slot and an always-replace slot
+BUCKET_SIZE = 2
+
+
+class TableEntry(NamedTuple):
+    depth: int
+    score: int
+    bound: int
+    move: int
+
+
+def table_words(memory_mb: float) -> int:
+    # The number of buckets is a power of two so that the bucket index is a mask of the key
+    buckets = 1
+    while buckets * 2 * BUCKET_SIZE * ENTRY_BYTES <= memory_mb * 1024 * 1024:
+        buckets *= 2
+
+    return buckets * BUCKET_SIZE * 2
+
+
+class TranspositionTable:
+    def __init__(self, memory_mb: float = 16, buffer=None):
+        # Any buffer of unsigned 64-bit words of the size given by table_words() can back the table
+        words = table_words(memory_mb)
+        self._words = buffer if buffer is not None else array('Q', [0]) * words
+        self._mask = words // (BUCKET_SIZE * 2) - 1
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    @property
+    def size(self) -> int:
+        return (self._mask + 1) * BUCKET_SIZE
+
+    def new_search(self) -> None:
+        # Entries of older searches are the first to be replaced
+        self.generation = (self.generation + 1) & 0x3F
+
+    def clear(self) -> None:
+        self._words[:] = array('Q', [0]) * len(self._words)
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def probe(self, key: int) -> TableEntry | None:
+        words = self._words
+        index = (key & self._mask) * BUCKET_SIZE * 2
+
+        for slot in range(index, index + BUCKET_SIZE * 2, 2):
+            data = words[slot + 1]
+            if data and words[slot] ^ data == key:
+                self.hits += 1
+                return TableEntry(
+                    depth=data >> 48 & 0x7F,
+                    score=(data >> 16 & 0xFFFFFFFF) - SCORE_OFFSET,
+                    bound=data >> 55 & 0x3,
+                    move=data & 0xFFFF,
+                )
+
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int = 0) -> None:
+        words = self._words
+        index = (key & self._mask) * BUCKET_SIZE * 2
+        data = (
+            move
+            | (score + SCORE_OFFSET) << 16
+            | min(depth, 0x7F) << 48
+            | bound << 55
+            | self.generation << 57
+        )
+
+        # The depth-preferred slot keeps the deepest result of the current search, everything else goes to the
+        # always-replace slot
+        stored = words[index + 1]
+        stored_key = words[index] ^ stored
+        if (
+            not stored or stored_key == key or stored >> 57 != self.generation
+            or depth >= (stored >> 48 & 0x7F)
+        ):
+            slot = index
+        else:
+            slot = index + 2
+            stored = words[slot + 1]
+            stored_key = words[slot] ^ stored
+
+        if stored and stored_key != key:
+            self.collisions += 1
+        self.stores += 1
+
+        words[slot] = key ^ data
+        words[slot + 1] = data
+
+    def stats(self) -> dict[str, int | float]:
+        probes = self.hits + self.misses
+        return {
+            'entries': self.size,
+            'memory_bytes': len(self._words) * 8,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'collisions': self.collisions,
+            'stores': self.stores,
+        }
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import random
+
+from core.attacks import pawn_attacks
+from core.pieces import Piece
+from core.pieces.pawn import Pawn
+
+# A fixed seed keeps keys identical across processes and runs, so hashes can be stored and shared
+_random = random.Random(0x5EED)
+
+# Indexed by color * 6 + Piece.kind, then by Coordinate.square
+PIECE_KEYS = [[_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+
+
+def piece_key(piece: Piece, square: int) -> int:
+    return PIECE_KEYS[piece.player.type.index * 6 + piece.kind][square]
+
+
+def en_passant_key(game: 'GameCore') -> int:
+    # The file is only hashed when a pawn of the side to move can take en passant, otherwise the position is the same
+    if game.en_passant is None:
+        return 0
+
+    square = game.en_passant.square
+    if not pawn_attacks(square, 1 - game.turn.type.index) & game.bitboard(Pawn.kind, game.turn):
+        return 0
+    return EN_PASSANT_KEYS[square & 7]
+
+
+def compute_hash(game: 'GameCore') -> int:
+    key = CASTLING_KEYS[game.castling_rights] ^ en_passant_key(game)
+    if game.turn == game.black:
+        key ^= BLACK_TO_MOVE_KEY
+
+    for coordinate, piece in game.pieces():
+        key ^= piece_key(piece, coordinate.square)
+
+    return key
@@ -1,8 +1,16 @@
+import argparse
+
 from ui import GameUI
 
 
 def main():
-    game = GameUI()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--render', choices=(GameUI.RENDER_FULL, GameUI.RENDER_DIRTY), default=GameUI.RENDER_FULL)
+    parser.add_argument('--fps', type=int, default=GameUI.MAX_FPS)
+    parser.add_argument('--event-driven', action='store_true', help='sleep until there is input instead of polling')
+    args = parser.parse_args()
+
+    game = GameUI(args.render, args.fps, args.event_driven)
     game.start()
 
 
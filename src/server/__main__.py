@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+
+from server.server import GameServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless chess game server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an idle game is removed')
+    parser.add_argument('--read-timeout', type=float, default=60.0, help='seconds before a silent client is dropped')
+    parser.add_argument('--max-games', type=int, default=100_000)
+    parser.add_argument('--move-cache', type=int, default=65_536, help='positions kept in the shared move cache')
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.idle_timeout, args.read_timeout, args.max_games, args.move_cache)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from server.server import GameServer
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str) -> str:
+    writer.write(line.encode() + b'\n')
+    await writer.drain()
+    response = (await reader.readline()).decode().strip()
+    if not response.startswith('ok'):
+        raise RuntimeError(f'{line!r} failed: {response}')
+
+    return response[3:]
+
+
+async def play(host: str, port: int, games: int, max_moves: int, rng: random.Random, latencies: list[float]) -> int:
+    # Every client plays its games one after another with random legal moves, only move requests are timed
+    reader, writer = await asyncio.open_connection(host, port)
+    moves = 0
+    try:
+        for _ in range(games):
+            game_id = (await request(reader, writer, 'new')).split()[0]
+            for _ in range(max_moves):
+                legal_moves = (await request(reader, writer, f'moves {game_id}')).split()
+                if not legal_moves:
+                    break
+
+                start = time.perf_counter()
+                response = await request(reader, writer, f'move {game_id} {rng.choice(legal_moves)}')
+                latencies.append(time.perf_counter() - start)
+                moves += 1
+                if response.endswith(('checkmate', 'stalemate')):
+                    break
+            await request(reader, writer, f'close {game_id}')
+
+        writer.write(b'quit\n')
+    finally:
+        writer.close()
+
+    return moves
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(host: str | None, port: int, clients: int, games: int, max_moves: int, seed: int) -> None:
+    server = None
+    if host is None:
+        server = GameServer(port=0)
+        await server.start()
+        host, port = server.host, server.port
+
+    latencies = []
+    start = time.perf_counter()
+    moves = await asyncio.gather(*(
+        play(host, port, games, max_moves, random.Random(seed + client), latencies) for client in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        await server.close()
+        print(f'move cache hit rate {server.move_cache.hit_rate:.1%}')
+
+    total = sum(moves)
+    print(f'{clients} clients, {clients * games} games, {total} moves in {elapsed:.2f}s '
+          f'({total / elapsed:,.0f} moves/s)')
+    print(f'move latency p50 {percentile(latencies, 0.5) * 1000:.2f}ms, p99 {percentile(latencies, 0.99) * 1000:.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the game server with concurrent clients')
+    parser.add_argument('--host', help='server to test, an in-process server is started when omitted')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--games', type=int, default=5, help='games played by every client')
+    parser.add_argument('--max-moves', type=int, default=100, help='moves per game')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.host, args.port, args.clients, args.games, args.max_moves, args.seed))
+
+
+if __name__ == '__main__':
+    main()
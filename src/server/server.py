@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from core.cache import MoveCache
+from core.coordinate import Coordinate
+from core.game import GameCore
+from core.pieces import Bishop, Knight, Queen, Rook
+
+PROMOTIONS = {'q': Queen, 'r': Rook, 'b': Bishop, 'n': Knight}
+
+
+class CommandError(Exception):
+    pass
+
+
+@dataclass
+class Session:
+    id: str
+    game: GameCore
+    last_active: float = field(default_factory=time.monotonic)
+
+
+class GameServer:
+    # Plain TCP line protocol, every request is one line and gets exactly one line back, starting with ok or error:
+    #   new [fen]            -> ok <id> <fen>
+    #   move <id> <e2e4>     -> ok <fen> [checkmate|stalemate]
+    #   moves <id>           -> ok <move> ...
+    #   fen <id>             -> ok <fen>
+    #   close <id>           -> ok
+    #   stats                -> ok games <count> <move cache statistics>
+    #   ping                 -> ok pong
+    #   quit                 closes the connection
+    # Games are not tied to a connection, a client can reconnect and continue a game until it is idle for too long.
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 7878,
+        idle_timeout: float = 300.0,
+        read_timeout: float = 60.0,
+        max_games: int = 100_000,
+        move_cache_size: int = 65_536,
+    ):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.read_timeout = read_timeout
+        self.max_games = max_games
+        self.sessions: dict[str, Session] = {}
+        # Shared by all games, so the opening positions every game goes through are generated once
+        self.move_cache = MoveCache(move_cache_size)
+        self._ids = itertools.count(1)
+        self._server: asyncio.Server | None = None
+        self._cleanup: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # With port 0 the system picks a free port
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._cleanup = asyncio.create_task(self._cleanup_idle_sessions())
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._cleanup is not None:
+            self._cleanup.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+                except asyncio.TimeoutError:
+                    writer.write(b'error timeout\n')
+                    break
+                except ValueError:
+                    writer.write(b'error line too long\n')
+                    break
+
+                if not line:
+                    break
+                line = line.decode(errors='replace').strip()
+                if line == 'quit':
+                    break
+                if line:
+                    writer.write(self.handle_command(line).encode() + b'\n')
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle_command(self, line: str) -> str:
+        command, _, argument = line.partition(' ')
+        handler = getattr(self, f'_command_{command}', None)
+        if handler is None:
+            return f'error unknown command {command}'
+
+        try:
+            return 'ok ' + handler(argument.strip())
+        except CommandError as error:
+            return f'error {error}'
+        except Exception as error:
+            # An unexpected failure is reported like any other error instead of ending the client task
+            return f'error internal {type(error).__name__}: {error}'
+
+    def _command_ping(self, argument: str) -> str:
+        return 'pong'
+
+    def _command_new(self, argument: str) -> str:
+        if len(self.sessions) >= self.max_games:
+            raise CommandError('too many games')
+
+        try:
+            game = GameCore(fen=argument or None, move_cache=self.move_cache)
+        except ValueError as error:
+            raise CommandError(error)
+
+        session = Session(str(next(self._ids)), game)
+        self.sessions[session.id] = session
+        return f'{session.id} {game.to_fen()}'
+
+    def _command_move(self, argument: str) -> str:
+        session_id, _, notation = argument.partition(' ')
+        game = self._session(session_id).game
+        if not game.playable():
+            raise CommandError('game over')
+
+        try:
+            start = Coordinate.from_algebraic(notation[:2])
+            end = Coordinate.from_algebraic(notation[2:4])
+        except ValueError:
+            raise CommandError(f'invalid move {notation}')
+        if (promotion := PROMOTIONS.get(notation[4:], Queen if len(notation) == 4 else None)) is None:
+            raise CommandError(f'invalid move {notation}')
+
+        piece = game[start]
+        if piece is None or piece.player != game.turn or not game.is_move_legal(start, end, game.turn):
+            raise CommandError(f'illegal move {notation}')
+
+        game.move(start, end, piece, promotion)
+        if game.playable():
+            return game.to_fen()
+        return f'{game.to_fen()} {"checkmate" if game.white_won or game.black_won else "stalemate"}'
+
+    def _command_moves(self, argument: str) -> str:
+        return ' '.join(str(move) for move in self._session(argument).game.legal_moves())
+
+    def _command_fen(self, argument: str) -> str:
+        return self._session(argument).game.to_fen()
+
+    def _command_close(self, argument: str) -> str:
+        if self.sessions.pop(argument, None) is None:
+            raise CommandError(f'unknown game {argument}')
+        return argument
+
+    def _command_stats(self, argument: str) -> str:
+        statistics = ' '.join(f'{name} {value:.3f}' if isinstance(value, float) else f'{name} {value}'
+                              for name, value in self.move_cache.stats().items())
+        return f'games {len(self.sessions)} {statistics}'
+
+    def _session(self, session_id: str) -> Session:
+        if (session := self.sessions.get(session_id)) is None:
+            raise CommandError(f'unknown game {session_id}')
+
+        session.last_active = time.monotonic()
+        return session
+
+    def _remove_idle_sessions(self) -> None:
+        deadline = time.monotonic() - self.idle_timeout
+        for session_id in [session.id for session in self.sessions.values() if session.last_active < deadline]:
+            del self.sessions[session_id]
+
+    async def _cleanup_idle_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self._remove_idle_sessions()
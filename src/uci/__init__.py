@@ -0,0 +1 @@
+from uci.adapter import UciAdapter
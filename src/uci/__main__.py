@@ -0,0 +1,9 @@
+from uci.adapter import UciAdapter
+
+
+def main():
+    UciAdapter().run()
+
+
+if __name__ == '__main__':
+    main()
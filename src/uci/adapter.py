@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import sys
+import threading
+from typing import TextIO
+
+from core.book import OpeningBook
+from core.engine import MATE_SCORE, MATE_THRESHOLD, Engine, SearchResult
+from core.fen import STARTING_FEN
+from core.game import GameCore
+from core.move import find_move
+from core.tablebase import Tablebase
+from core.transposition import TranspositionTable
+
+DEFAULT_HASH_MB = 16
+# Fraction of the remaining clock spent on one move when the GUI does not send movestogo
+MOVES_TO_GO = 30
+# Arguments of go that take a number, the others are flags or, for searchmoves, followed by a list of moves
+GO_VALUES = {'depth', 'nodes', 'mate', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo'}
+GO_FLAGS = {'infinite', 'ponder'}
+
+
+class UciAdapter:
+    def __init__(self, output: TextIO = sys.stdout):
+        self.output = output
+        self.game = GameCore()
+        self.table = TranspositionTable(DEFAULT_HASH_MB)
+        self.book: OpeningBook | None = None
+        self.tablebase: Tablebase | None = None
+        # The position command is applied on top of the previous one, these are what the game currently holds
+        self._fen = STARTING_FEN
+        self._moves: list[str] = []
+        self._search: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._output_lock = threading.Lock()
+
+    def send(self, line: str) -> None:
+        with self._output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def run(self, input: TextIO = sys.stdin) -> None:
+        for line in input:
+            if not self.handle(line):
+                break
+
+    def handle(self, line: str) -> bool:
+        # Returns False once the engine should exit
+        command, *arguments = line.split() or ['']
+        if command == 'quit':
+            self.stop()
+            return False
+
+        handler = getattr(self, f'_command_{command}', None)
+        if handler is not None:
+            handler(arguments)
+        return True
+
+    def stop(self) -> None:
+        if self._search is not None:
+            self._stop_event.set()
+            self._search.join()
+            self._search = None
+
+    def _command_uci(self, arguments: list[str]) -> None:
+        self.send('id name chess')
+        self.send('id author chess contributors')
+        self.send(f'option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 4096')
+        self.send('option name BookFile type string default <empty>')
+        self.send('option name TablebasePath type string default <empty>')
+        self.send('uciok')
+
+    def _command_isready(self, arguments: list[str]) -> None:
+        # Answered right away, even while a search is running
+        self.send('readyok')
+
+    def _command_setoption(self, arguments: list[str]) -> None:
+        line = ' '.join(arguments)
+        name, _, value = line.removeprefix('name ').partition(' value ')
+        name, value = name.strip().lower(), value.strip()
+        if name == 'hash' and value.isdigit():
+            self.stop()
+            self.table = TranspositionTable(int(value))
+        elif name == 'bookfile':
+            if self.book is not None:
+                self.book.close()
+                self.book = None
+            if value and value != '<empty>':
+                try:
+                    self.book = OpeningBook(value)
+                except (OSError, ValueError) as error:
+                    self.send(f'info string {error}')
+        elif name == 'tablebasepath':
+            self.stop()
+            if self.tablebase is not None:
+                self.tablebase.close()
+            self.tablebase = Tablebase(value) if value and value != '<empty>' else None
+
+    def _command_ucinewgame(self, arguments: list[str]) -> None:
+        self.stop()
+        self.table.clear()
+
+    def _command_stop(self, arguments: list[str]) -> None:
+        self.stop()
+
+    def _command_position(self, arguments: list[str]) -> None:
+        self.stop()
+        if 'moves' in arguments:
+            index = arguments.index('moves')
+            arguments, moves = arguments[:index], arguments[index + 1:]
+        else:
+            moves = []
+
+        if arguments[:1] == ['startpos']:
+            fen = STARTING_FEN
+        elif arguments[:1] == ['fen']:
+            fen = ' '.join(arguments[1:])
+        else:
+            return
+
+        # Usually the new position is the previous one plus the moves played since, so only those are made. Moves
+        # that are no longer part of the game are taken back first.
+        if fen != self._fen:
+            try:
+                self.game.load_fen(fen)
+            except ValueError as error:
+                self.send(f'info string {error}')
+                return
+            self._fen, self._moves = fen, []
+
+        common = 0
+        while common < min(len(moves), len(self._moves)) and moves[common] == self._moves[common]:
+            common += 1
+        for _ in range(len(self._moves) - common):
+            self.game.unmake_move()
+        del self._moves[common:]
+
+        for notation in moves[common:]:
+            if (move := find_move(self.game, notation)) is None:
+                self.send(f'info string illegal move {notation}')
+                break
+            self.game.make_move(move)
+            self._moves.append(notation)
+
+    def _command_go(self, arguments: list[str]) -> None:
+        self.stop()
+        options, flags = self._parse_go(arguments)
+        infinite = 'infinite' in flags
+        # Book moves are played without searching, except when analysing with go infinite
+        if not infinite and self.book is not None and (move := self.book.choose(self.game)) is not None:
+            self.send(f'bestmove {move}')
+            return
+
+        max_depth = options.get('depth', 64)
+        max_nodes = options.get('nodes')
+        time_limit = self._time_limit(options) if not infinite else None
+
+        self._stop_event.clear()
+        engine = Engine(self.game, self.table, self._stop_event, self._send_info, self.tablebase)
+        self._search = threading.Thread(
+            target=self._run_search, args=(engine, max_depth, max_nodes, time_limit, infinite)
+        )
+        self._search.start()
+
+    def _parse_go(self, arguments: list[str]) -> tuple[dict[str, int], set[str]]:
+        options, flags = {}, set()
+        index = 0
+        while index < len(arguments):
+            keyword = arguments[index]
+            index += 1
+            if keyword in GO_FLAGS:
+                flags.add(keyword)
+            elif keyword == 'searchmoves':
+                # Restricting the root moves is not supported, the moves are skipped
+                while index < len(arguments) and arguments[index] not in GO_VALUES | GO_FLAGS:
+                    index += 1
+            elif keyword in GO_VALUES:
+                value = arguments[index] if index < len(arguments) else ''
+                if value not in GO_VALUES | GO_FLAGS:
+                    index += 1
+                try:
+                    options[keyword] = int(value)
+                except ValueError:
+                    self.send(f'info string invalid value for {keyword}: {value!r}')
+            else:
+                self.send(f'info string unknown go argument {keyword}')
+
+        return options, flags
+
+    def _time_limit(self, options: dict[str, int]) -> float | None:
+        if 'movetime' in options:
+            return max(options['movetime'], 0) / 1000
+
+        clock, increment = ('wtime', 'winc') if self.game.turn == self.game.white else ('btime', 'binc')
+        if clock not in options:
+            return None
+
+        moves_to_go = options.get('movestogo') or MOVES_TO_GO
+        return max(options[clock] / moves_to_go + options.get(increment, 0) * 0.8, 0) / 1000
+
+    def _run_search(
+        self,
+        engine: Engine,
+        max_depth: int,
+        max_nodes: int | None,
+        time_limit: float | None,
+        infinite: bool,
+    ) -> None:
+        # bestmove is sent whatever happens, a GUI waiting for it would otherwise hang
+        move = None
+        try:
+            move = engine.search(max_depth, max_nodes, time_limit).move
+        except Exception as error:
+            self.send(f'info string search failed: {type(error).__name__}: {error}')
+
+        if infinite:
+            # With go infinite bestmove may only be sent after stop, even when the search ended on its own
+            self._stop_event.wait()
+        self.send(f'bestmove {move}' if move else 'bestmove 0000')
+
+    def _send_info(self, result: SearchResult) -> None:
+        if abs(result.score) >= MATE_THRESHOLD:
+            moves = (MATE_SCORE - abs(result.score) + 1) // 2
+            score = f'mate {moves if result.score > 0 else -moves}'
+        else:
+            score = f'cp {result.score}'
+
+        self.send(
+            f'info depth {result.depth} score {score} nodes {result.nodes} nps {result.nps:.0f} '
+            f'time {result.elapsed * 1000:.0f} pv {result.move}'
+        )
@@ -1,3 +1,5 @@
+import time
+
 import pygame
 from pygame import Surface
 from pygame.event import Event
@@ -13,14 +15,42 @@ class GameUI:
     IMAGES: dict[str, Surface] = {}
     MAX_FPS = 15
 
-    def __init__(self):
+    # Full redraws and flips the whole window every frame, dirty only redraws and updates the squares that changed
+    RENDER_FULL = 'full'
+    RENDER_DIRTY = 'dirty'
+    # Number of frames the frame time is averaged over
+    FRAME_TIME_WINDOW = 60
+    # In event driven mode the loop wakes up at least this often, for anything that changes with time
+    WAIT_TIMEOUT_MS = 1000
+
+    def __init__(
+        self,
+        render_mode: str = RENDER_FULL,
+        max_fps: int = MAX_FPS,
+        event_driven: bool = False,
+        wait_timeout_ms: int = WAIT_TIMEOUT_MS,
+    ):
         pygame.init()
         self.screen = pygame.display.set_mode((self.BOARD_WIDTH, self.BOARD_HEIGHT))
         self.screen.fill(pygame.Color('white'))
 
+        self.render_mode = render_mode
+        self.max_fps = max_fps
+        self.event_driven = event_driven
+        self.wait_timeout_ms = wait_timeout_ms
         self.clock = pygame.time.Clock()
         self.__load_images()
 
+        # The board and the highlight overlays never change, so they are drawn once
+        self.background = self.__render_background()
+        self.overlays = {
+            'selected': self.__render_overlay(pygame.Color('blue')),
+            'possible': self.__render_overlay(pygame.Color('yellow')),
+        }
+        # What each square showed in the last frame in dirty mode: piece code and overlay name
+        self.rendered_squares: dict[Coordinate, tuple[str | None, str | None]] = {}
+        self.frame_times: list[float] = []
+
         self.game_core = GameCore()
         # for column in range(8):
         #     for row in range(8):
@@ -36,31 +66,77 @@ class GameUI:
         self.current_player = self.game_core.current_player
 
     def start(self):
-        game_over = False
+        if self.event_driven:
+            self._run_event_driven()
+        else:
+            self._run_polling()
+
+        pygame.time.delay(3000)
+        pygame.quit()
+
+    def _run_polling(self) -> None:
+        running = True
 
-        while self.game_core.playable() and not game_over:
+        while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    break
+                    return
+
+                self._handle_event(event)
+
+            self._render()
+            running = not self._show_game_over()
+            self.clock.tick(self.max_fps)
+
+    def _run_event_driven(self) -> None:
+        # The loop sleeps in pygame.event.wait and only renders after an event that can change what is shown
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+        changed = True
+
+        while True:
+            if changed:
+                # The final move is rendered and reported here as well, the game core is no longer playable by then
+                self._render()
+                if self._show_game_over():
+                    return
+                changed = False
+                # Rendering never runs more often than max_fps, even when clicks arrive faster
+                self.clock.tick(self.max_fps)
 
+            event = pygame.event.wait(self.wait_timeout_ms)
+            if event.type == pygame.QUIT:
+                return
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # The window contents were lost, every square has to be drawn again
+                self.rendered_squares = {}
+                changed = True
+            elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._handle_event(event)
+                changed = True
 
+    def _render(self) -> None:
+        frame_start = time.perf_counter()
+        if self.render_mode == self.RENDER_DIRTY:
+            self._draw_changed_squares()
+        else:
             self._draw_board()
             self._draw_pieces()
             self._highlight_squares()
-
-            if self.game_core.white_won:
-                self.game_over_screen('White won!')
-                game_over = True
-            elif self.game_core.black_won:
-                self.game_over_screen('Black won!')
-                game_over = True
-
-            self.clock.tick(self.MAX_FPS)
             pygame.display.flip()
+        self._count_frame(time.perf_counter() - frame_start)
 
-        pygame.time.delay(3000)
-        pygame.quit()
+    def _show_game_over(self) -> bool:
+        if self.game_core.white_won:
+            self.game_over_screen('White won!')
+            return True
+        if self.game_core.black_won:
+            self.game_over_screen('Black won!')
+            return True
+        if not self.game_core.playable():
+            self.game_over_screen('Stalemate!')
+            return True
+
+        return False
 
     def game_over_screen(self, message):
         font = pygame.font.Font(None, 36)
@@ -76,7 +152,7 @@ class GameUI:
             location = pygame.mouse.get_pos()
             column, row = int(location[0] // self.SQUARE_SIZE), int(location[1] // self.SQUARE_SIZE)
 
-            coordinate = Coordinate(column, row)
+            coordinate = Coordinate.at(column, row)
             piece = self.game_core[coordinate]
             print(f'Selected coordinate - {coordinate}')
             print(f'Piece in selected coordinate - {piece}')
@@ -114,13 +190,8 @@ class GameUI:
 
             # If coordinate is one of the possible moves
             if coordinate in self.possible_moves:
+                # possible_moves only holds legal moves, so the move needs no further checks
                 last_piece = self.game_core[self.last_selected_coordinate]
-
-                # Check if the move puts the own king in check
-                if not self.game_core.is_move_legal(self.last_selected_coordinate, coordinate, self.current_player):
-                    print('Illegal move - puts own king in check')
-                    return
-
                 self.game_core.move(self.last_selected_coordinate, coordinate, last_piece)
                 self.last_selected_coordinate = None
                 self.player_clicks = []
@@ -134,18 +205,12 @@ class GameUI:
             self.possible_moves = []
 
     def _draw_board(self) -> None:
-        colors = [pygame.Color('white'), pygame.Color('gray')]
-        for row in range(self.DIMENSION):
-            for column in range(self.DIMENSION):
-                color = colors[(row + column) % 2]
-
-                rectangle_size = column * self.SQUARE_SIZE, row * self.SQUARE_SIZE, self.SQUARE_SIZE, self.SQUARE_SIZE
-                pygame.draw.rect(self.screen, color, rectangle_size)
+        self.screen.blit(self.background, (0, 0))
 
     def _draw_pieces(self) -> None:
         for row in range(self.DIMENSION):
             for column in range(self.DIMENSION):
-                coordinate = Coordinate(column, row)
+                coordinate = Coordinate.at(column, row)
                 piece = self.game_core[coordinate]
 
                 rectangle_size = column * self.SQUARE_SIZE, row * self.SQUARE_SIZE, self.SQUARE_SIZE, self.SQUARE_SIZE
@@ -158,20 +223,70 @@ class GameUI:
 
         piece = self.game_core[self.last_selected_coordinate]
         if piece.player == self.current_player:
-            s = pygame.Surface(self.PIECE_SIZE)
-            s.set_alpha(100)
-            s.fill(pygame.Color('blue'))
-
             row, column = self.last_selected_coordinate.x, self.last_selected_coordinate.y
-            self.screen.blit(s, (row * self.SQUARE_SIZE, column * self.SQUARE_SIZE))
+            self.screen.blit(self.overlays['selected'], (row * self.SQUARE_SIZE, column * self.SQUARE_SIZE))
 
         for coordinate in self.possible_moves:
-            s = pygame.Surface(self.PIECE_SIZE)
-            s.set_alpha(100)
-            s.fill(pygame.Color('yellow'))
-
             row, column = coordinate.x, coordinate.y
-            self.screen.blit(s, (row * self.SQUARE_SIZE, column * self.SQUARE_SIZE))
+            self.screen.blit(self.overlays['possible'], (row * self.SQUARE_SIZE, column * self.SQUARE_SIZE))
+
+    def _draw_changed_squares(self) -> None:
+        overlays = {coordinate: 'possible' for coordinate in self.possible_moves}
+        if self.last_selected_coordinate is not None:
+            overlays[self.last_selected_coordinate] = 'selected'
+
+        changed_rectangles = []
+        for row in range(self.DIMENSION):
+            for column in range(self.DIMENSION):
+                coordinate = Coordinate.at(column, row)
+                piece = self.game_core[coordinate]
+                square = (piece.code if piece is not None else None, overlays.get(coordinate))
+                if self.rendered_squares.get(coordinate) == square:
+                    continue
+
+                self.rendered_squares[coordinate] = square
+                rectangle = pygame.Rect(
+                    column * self.SQUARE_SIZE, row * self.SQUARE_SIZE, self.SQUARE_SIZE, self.SQUARE_SIZE
+                )
+                self.screen.blit(self.background, rectangle, rectangle)
+                if piece is not None:
+                    self.screen.blit(self.IMAGES[piece.code], rectangle)
+                if square[1] is not None:
+                    self.screen.blit(self.overlays[square[1]], rectangle)
+                changed_rectangles.append(rectangle)
+
+        if changed_rectangles:
+            pygame.display.update(changed_rectangles)
+
+    def _count_frame(self, frame_time: float) -> None:
+        # The average time spent drawing a frame is shown in the window title
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) < self.FRAME_TIME_WINDOW:
+            return
+
+        average = sum(self.frame_times) / len(self.frame_times)
+        self.frame_times = []
+        pygame.display.set_caption(
+            f'{self.render_mode} rendering: {average * 1000:.2f} ms per frame, {self.clock.get_fps():.0f} fps'
+        )
+
+    def __render_background(self) -> Surface:
+        background = pygame.Surface((self.BOARD_WIDTH, self.BOARD_HEIGHT))
+        colors = [pygame.Color('white'), pygame.Color('gray')]
+        for row in range(self.DIMENSION):
+            for column in range(self.DIMENSION):
+                color = colors[(row + column) % 2]
+
+                rectangle_size = column * self.SQUARE_SIZE, row * self.SQUARE_SIZE, self.SQUARE_SIZE, self.SQUARE_SIZE
+                pygame.draw.rect(background, color, rectangle_size)
+
+        return background
+
+    def __render_overlay(self, color: pygame.Color) -> Surface:
+        overlay = pygame.Surface(self.PIECE_SIZE)
+        overlay.set_alpha(100)
+        overlay.fill(color)
+        return overlay
 
     def __load_images(self):
         pieces = ['bR', 'bN', 'bB', 'bQ', 'bK', 'wR', 'wN', 'wB', 'wQ', 'wK', 'wp', 'bp']